@@ -1,25 +1,42 @@
 """Balochi Natural Language Processing Toolkit"""
 
+from typing import TYPE_CHECKING
+
+from ._lazy import attach
+
 __version__ = "1.0.4"
 __author__ = "Shehzad Khalid"
 __email__ = "shehzadkhalid04@gmail.com"
 
-from .bal_tokenizer.bytes_pair_tokenizer import BalBPETokenizer
-from .bal_tokenizer.sentence_tokenizer import BalochiSentenceTokenizer
-from .bal_tokenizer.sentencepiece_tokenizer import BalSentencePieceTokenizer
-from .bal_tokenizer.word_tokenizer import BalochiWordTokenizer
-from .dedup.near_dedup import NearDedup
-from .preprocessing.stopwords import BalochiStopwordRemover
-from .preprocessing.text_cleaner import BalochiTextCleaner
-from .preprocessing.text_normalizer import BalochiTextNormalizer
+# Exported names and the submodules defining them. Submodules are imported on
+# first access, so `import balnlp` itself imports and reads nothing.
+_EXPORTS = {
+    "BalSentencePieceTokenizer": ".bal_tokenizer.sentencepiece_tokenizer",
+    "ExactDedup": ".dedup.exact",
+    "NearDedup": ".dedup.minhash",
+    "BalochiStopwordRemover": ".preprocessing.stopwords",
+    "BalochiTextCleaner": ".preprocessing.cleaner",
+    "BalochiTextNormalizer": ".preprocessing.normalizer",
+    "Pipeline": ".pipeline",
+}
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
 
 __all__ = [
-    "BalochiWordTokenizer",
-    "BalochiSentenceTokenizer",
+    "BalSentencePieceTokenizer",
+    "ExactDedup",
     "NearDedup",
+    "BalochiStopwordRemover",
     "BalochiTextCleaner",
     "BalochiTextNormalizer",
-    "BalochiStopwordRemover",
-    "BalSentencePieceTokenizer",
-    "BalBPETokenizer",
+    "Pipeline",
 ]
+
+if TYPE_CHECKING:
+    from .bal_tokenizer.sentencepiece_tokenizer import BalSentencePieceTokenizer
+    from .dedup.exact import ExactDedup
+    from .dedup.minhash import NearDedup
+    from .pipeline import Pipeline
+    from .preprocessing.cleaner import BalochiTextCleaner
+    from .preprocessing.normalizer import BalochiTextNormalizer
+    from .preprocessing.stopwords import BalochiStopwordRemover
@@ -0,0 +1,41 @@
+"""Deferred attribute imports for package __init__ modules."""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def attach(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build module-level __getattr__ and __dir__ functions for a package.
+
+    Nothing is imported until an exported name is first accessed; the
+    submodule is imported then and the value cached in the package
+    namespace, so later accesses are plain attribute lookups.
+
+    Args:
+        package: The package's __name__
+        exports: Maps exported names to the submodule defining them,
+            relative to the package (e.g. ".dedup.minhash")
+
+    Returns:
+        Tuple of (__getattr__, __dir__)
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        try:
+            module_name = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            ) from None
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,4 +1,19 @@
-# from src.bal_tokenizer.sentence_tokenizer import BalochiSentenceTokenizer
-# from src.bal_tokenizer.Word_tokenizer import BalochiWordTokenizer
-#
-# __all__ = ["BalochiWordTokenizer", "BalochiSentenceTokenizer"]
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "BalSentencePieceTokenizer": ".sentencepiece_tokenizer",
+    "LRUCache": ".cache",
+}
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+__all__ = [
+    "BalSentencePieceTokenizer",
+    "LRUCache",
+]
+
+if TYPE_CHECKING:
+    from .cache import LRUCache
+    from .sentencepiece_tokenizer import BalSentencePieceTokenizer
@@ -1,6 +1,14 @@
 import os
-import tempfile
-from typing import List, Optional
+import re
+import sys
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..utils.token_dataset import token_dtype_for
+from .cache import LRUCache
 
 try:
     import sentencepiece as spm
@@ -10,72 +18,279 @@ except ImportError:
     spm = None
     SPM_AVAILABLE = False
 
+# Whitespace runs that SentencePiece's default normalizer collapses to one space
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
 
 class BalSentencePieceTokenizer:
     """
     SentencePiece tokenizer wrapper for Balochi text.
     """
 
-    def __init__(self, model_prefix: str = "balochi_sp"):
+    def __init__(
+        self,
+        model_prefix: str = "balochi_sp",
+        cache_entries: int = 0,
+        cache_bytes: Optional[int] = None,
+        normalize_cache_keys: bool = True,
+    ):
+        """
+        Initialize the tokenizer.
+
+        Args:
+            model_prefix: Path prefix of the model files written by train()
+            cache_entries: Size of the LRU caches in front of encode() and
+                decode() (0 disables caching)
+            cache_bytes: Byte budget of each cache (None: entries only)
+            normalize_cache_keys: Key the encode cache on the text with
+                whitespace runs collapsed and stripped, so spacing variants
+                share one entry. Matches SentencePiece's default
+                remove_extra_whitespaces (used by train()); disable it for
+                models trained without it. Unicode normalization is left to
+                the model: its NFKC rules do not reorder combining marks the
+                way unicodedata does, so NFC keys could change the IDs.
+        """
         self.model_prefix = model_prefix
+        self.normalize_cache_keys = normalize_cache_keys
+        self.encode_cache: Optional[LRUCache] = None
+        self.decode_cache: Optional[LRUCache] = None
+        if cache_entries:
+            self.encode_cache = LRUCache(cache_entries, cache_bytes)
+            self.decode_cache = LRUCache(cache_entries, cache_bytes)
         self.sp_model = None
 
+    @property
+    def sp_model(self):
+        """The SentencePieceProcessor; assigning a new one clears the caches."""
+        return self._sp_model
+
+    @sp_model.setter
+    def sp_model(self, sp_model) -> None:
+        self._sp_model = sp_model
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Drop every cached encoding and decoding."""
+        for cache in (self.encode_cache, self.decode_cache):
+            if cache is not None:
+                cache.clear()
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit/miss statistics of the encode and decode caches."""
+        return {
+            name: cache.stats()
+            for name, cache in (
+                ("encode", self.encode_cache),
+                ("decode", self.decode_cache),
+            )
+            if cache is not None
+        }
+
+    def _cache_key(self, text: str) -> str:
+        if not self.normalize_cache_keys:
+            return text
+        return _WHITESPACE.sub(" ", text).strip(" ")
+
+    def _encode_cached(self, key: str) -> array:
+        """Encoded IDs of a cache key, computed and stored on a miss."""
+        ids = self.encode_cache.get(key)
+        if ids is None:
+            ids = array("i", self.sp_model.encode_as_ids(key))
+            self.encode_cache.put(key, ids, sys.getsizeof(key) + sys.getsizeof(ids))
+        return ids
+
     def train(
-        self, texts: List[str], vocab_size: int = 10000, save_dir: Optional[str] = None
+        self,
+        texts: Optional[Iterable[str]] = None,
+        vocab_size: int = 10000,
+        save_dir: Optional[str] = None,
+        input_files: Optional[Union[str, Sequence[str]]] = None,
+        input_sentence_size: int = 0,
+        shuffle_input_sentence: bool = True,
+        num_threads: Optional[int] = None,
+        max_sentence_length: int = 4192,
+        **trainer_options,
     ):
-        """Train SentencePiece model."""
+        """
+        Train SentencePiece model.
+
+        Sentences are streamed to the trainer, from files it reads itself or
+        from an iterator, so no copy of the corpus is written or held here.
+
+        Args:
+            texts: Iterable of sentences (a list, a generator, an open file)
+            vocab_size: Size of the vocabulary
+            save_dir: Directory to copy the trained model files to
+            input_files: Corpus file or files to train on instead of texts,
+                one sentence per line (.gz/.bz2/.xz files are decompressed
+                while streaming)
+            input_sentence_size: Number of sentences sampled from the input
+                for training (0: use every sentence). Bounds training memory
+                and time on large corpora.
+            shuffle_input_sentence: Sample sentences uniformly from the whole
+                input instead of taking the first input_sentence_size
+            num_threads: Trainer threads (default: one per CPU)
+            max_sentence_length: Sentences longer than this many bytes are
+                skipped
+            **trainer_options: Further SentencePieceTrainer options, e.g.
+                train_extremely_large_corpus=True
+        """
         if not SPM_AVAILABLE:
             raise ImportError(
                 "sentencepiece is required. Install with: pip install sentencepiece"
             )
+        if (texts is None) == (input_files is None):
+            raise ValueError("Pass exactly one of texts and input_files")
 
-        # Save texts to temporary file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            for text in texts:
-                f.write(text + "\n")
-            temp_file = f.name
-
-        try:
-            # Train model
-            spm.SentencePieceTrainer.Train(  # type: ignore
-                input=temp_file,
-                model_prefix=self.model_prefix,
-                vocab_size=vocab_size,
-                character_coverage=0.9995,
-                model_type="bpe",
-                pad_id=0,
-                unk_id=1,
-                bos_id=2,
-                eos_id=3,
-                pad_piece="<pad>",
-                unk_piece="<unk>",
-                bos_piece="<s>",
-                eos_piece="</s>",
-            )
+        source: Dict[str, object] = {}
+        if input_files is not None:
+            from ..utils.utils_file import compression_of
 
-            # Load model - Initialize and load in separate steps
-            sp_model_instance = spm.SentencePieceProcessor()  # type: ignore
-            sp_model_instance.load(f"{self.model_prefix}.model")
-            self.sp_model = sp_model_instance
+            files = [input_files] if isinstance(input_files, str) else list(input_files)
+            if any(compression_of(path) for path in files):
+                source["sentence_iterator"] = _iter_file_lines(files)
+            else:
+                source["input"] = files
+        else:
+            source["sentence_iterator"] = iter(texts)
 
-            # Save to directory if specified
-            if save_dir:
-                self.save(save_dir)
+        options = dict(
+            model_prefix=self.model_prefix,
+            vocab_size=vocab_size,
+            character_coverage=0.9995,
+            model_type="bpe",
+            pad_id=0,
+            unk_id=1,
+            bos_id=2,
+            eos_id=3,
+            pad_piece="<pad>",
+            unk_piece="<unk>",
+            bos_piece="<s>",
+            eos_piece="</s>",
+            input_sentence_size=input_sentence_size,
+            shuffle_input_sentence=shuffle_input_sentence,
+            num_threads=num_threads or os.cpu_count() or 1,
+            max_sentence_length=max_sentence_length,
+        )
+        options.update(trainer_options)
+        spm.SentencePieceTrainer.Train(**options, **source)  # type: ignore
 
-        finally:
-            os.unlink(temp_file)
+        # Load model - Initialize and load in separate steps
+        sp_model_instance = spm.SentencePieceProcessor()  # type: ignore
+        sp_model_instance.load(f"{self.model_prefix}.model")
+        self.sp_model = sp_model_instance
+
+        # Save to directory if specified
+        if save_dir:
+            self.save(save_dir)
 
     def encode(self, text: str) -> List[int]:
         """Encode text to token IDs."""
         if self.sp_model is None:
             raise ValueError("Tokenizer not trained. Call train() first.")
-        return self.sp_model.encode_as_ids(text)
+        if self.encode_cache is None:
+            return self.sp_model.encode_as_ids(text)
+        return self._encode_cached(self._cache_key(text)).tolist()
+
+    @property
+    def vocab_size(self) -> int:
+        """Number of pieces in the model."""
+        if self.sp_model is None:
+            raise ValueError("Tokenizer not trained. Call train() first.")
+        return self.sp_model.get_piece_size()
+
+    @property
+    def eos_id(self) -> int:
+        """ID of the end-of-sentence piece (</s>)."""
+        if self.sp_model is None:
+            raise ValueError("Tokenizer not trained. Call train() first.")
+        return self.sp_model.eos_id()
+
+    @property
+    def token_dtype(self) -> np.dtype:
+        """Smallest unsigned dtype that holds every token ID."""
+        return token_dtype_for(self.vocab_size)
+
+    def encode_batch(
+        self,
+        texts: Sequence[str],
+        num_threads: int = -1,
+        add_eos: bool = False,
+        dtype: Optional[np.dtype] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode many texts at once with SentencePiece's multithreaded encoder.
+
+        The result is ragged: the IDs of texts[i] are
+        tokens[offsets[i]:offsets[i + 1]], so no per-text lists survive the
+        call.
+
+        Args:
+            texts: Texts to encode
+            num_threads: Encoder threads (-1: one per CPU)
+            add_eos: Append the EOS ID to every text
+            dtype: Token dtype (default: token_dtype)
+
+        Returns:
+            Tuple of (tokens, offsets): a flat token array and an int64 array
+            of len(texts) + 1 start offsets
+        """
+        if self.sp_model is None:
+            raise ValueError("Tokenizer not trained. Call train() first.")
+
+        if self.encode_cache is None:
+            ids = self.sp_model.encode(
+                list(texts), out_type=int, add_eos=add_eos, num_threads=num_threads
+            )
+        else:
+            ids = self._encode_batch_cached(texts, num_threads)
+            if add_eos:
+                eos = [self.eos_id]
+                ids = [x.tolist() + eos for x in ids]
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in ids], out=offsets[1:])
+        tokens = np.fromiter(
+            chain.from_iterable(ids),
+            dtype=dtype or self.token_dtype,
+            count=int(offsets[-1]),
+        )
+        return tokens, offsets
+
+    def _encode_batch_cached(
+        self, texts: Sequence[str], num_threads: int
+    ) -> List[array]:
+        """encode_batch() IDs with cache hits looked up and misses batch-encoded."""
+        keys = [self._cache_key(text) for text in texts]
+        cache = self.encode_cache
+        ids: List[Optional[array]] = [cache.get(key) for key in keys]
+
+        missing = list({keys[i]: None for i, x in enumerate(ids) if x is None})
+        if missing:
+            encoded = self.sp_model.encode(
+                missing, out_type=int, num_threads=num_threads
+            )
+            fresh = {}
+            for key, key_ids in zip(missing, encoded):
+                fresh[key] = array("i", key_ids)
+                cache.put(
+                    key, fresh[key], sys.getsizeof(key) + sys.getsizeof(fresh[key])
+                )
+            ids = [fresh[key] if x is None else x for key, x in zip(keys, ids)]
+        return ids
 
     def decode(self, token_ids: List[int]) -> str:
         """Decode token IDs to text."""
         if self.sp_model is None:
             raise ValueError("Tokenizer not trained. Call train() first.")
-        return self.sp_model.decode_ids(token_ids)
+        if self.decode_cache is None:
+            return self.sp_model.decode_ids(token_ids)
+
+        key = tuple(token_ids)
+        text = self.decode_cache.get(key)
+        if text is None:
+            text = self.sp_model.decode_ids(list(key))
+            self.decode_cache.put(key, text, sys.getsizeof(key) + sys.getsizeof(text))
+        return text
 
     def save(self, save_dir: str):
         """Save tokenizer files."""
@@ -118,3 +333,13 @@ class BalSentencePieceTokenizer:
         sp_model_instance = spm.SentencePieceProcessor()  # type: ignore
         sp_model_instance.load(model_path)
         self.sp_model = sp_model_instance
+
+
+def _iter_file_lines(paths: Sequence[str]) -> Iterator[str]:
+    """Stream the lines of (possibly compressed) files, without newlines."""
+    from ..utils.utils_file import open_file
+
+    for path in paths:
+        with open_file(path) as f:
+            for line in f:
+                yield line.rstrip("\r\n")
@@ -1,11 +1,32 @@
-from .exact_dedup import ExactDedup
-from .near_dedup import NearDedup
-from .repetition_dedup import CharLevelDedup, RepetitionDedup, WordRepetitionDedup
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "ExactDedup": ".exact",
+    "NearDedup": ".minhash",
+    "MinHasher": ".minhash",
+    "LSHIndex": ".lsh",
+    "DigestSet": ".digest_set",
+    "BloomFilter": ".digest_set",
+    "DigestStore": ".digest_store",
+}
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
 
 __all__ = [
     "ExactDedup",
     "NearDedup",
-    "RepetitionDedup",
-    "CharLevelDedup",
-    "WordRepetitionDedup",
+    "MinHasher",
+    "LSHIndex",
+    "DigestSet",
+    "BloomFilter",
+    "DigestStore",
 ]
+
+if TYPE_CHECKING:
+    from .digest_set import BloomFilter, DigestSet
+    from .digest_store import DigestStore
+    from .exact import ExactDedup
+    from .lsh import LSHIndex
+    from .minhash import MinHasher, NearDedup
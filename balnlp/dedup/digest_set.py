@@ -0,0 +1,283 @@
+import json
+import math
+import os
+import struct
+from array import array
+from typing import Any, Dict, List, Tuple
+
+_STATE_MAGIC = b"BALNDSET"
+
+
+class DigestSet:
+    """
+    Open-addressing hash set of fixed-width binary digests.
+
+    Digests are stored as 64-bit words in a flat array ("Q" typecode), so each
+    entry costs 8 or 16 bytes divided by the load factor instead of the
+    ~100 bytes of a hex string in a Python set. The all-zero word marks an
+    empty slot, so an all-zero digest is stored as 1 (probability 2^-64).
+    """
+
+    def __init__(
+        self,
+        digest_bits: int = 64,
+        initial_capacity: int = 1 << 16,
+        max_load: float = 0.7,
+    ):
+        """
+        Initialize an empty set.
+
+        Args:
+            digest_bits: Digest width, 64 or 128
+            initial_capacity: Initial number of slots (rounded up to a power of 2)
+            max_load: Fill ratio that triggers doubling the table
+        """
+        if digest_bits not in (64, 128):
+            raise ValueError("digest_bits must be 64 or 128")
+        if not 0.0 < max_load < 1.0:
+            raise ValueError("max_load must be between 0 and 1")
+
+        self.digest_bits = digest_bits
+        self.max_load = max_load
+        self._words = digest_bits // 64
+        self._capacity = 1 << max(3, (initial_capacity - 1).bit_length())
+        self._table = array("Q", bytes(8 * self._words * self._capacity))
+        self._size = 0
+
+    @property
+    def digest_size(self) -> int:
+        """Digest width in bytes."""
+        return self.digest_bits // 8
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes used by the slot table."""
+        return self._table.itemsize * len(self._table)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _key(self, digest: bytes) -> Tuple[int, ...]:
+        """Split a digest into 64-bit words, never all zero."""
+        if len(digest) != self.digest_size:
+            raise ValueError(f"Expected a {self.digest_size}-byte digest")
+        if self._words == 1:
+            return (int.from_bytes(digest, "little") or 1,)
+        words = (
+            int.from_bytes(digest[:8], "little"),
+            int.from_bytes(digest[8:], "little"),
+        )
+        return words if any(words) else (1, 0)
+
+    def _find(self, key: Tuple[int, ...]) -> Tuple[int, bool]:
+        """Return (slot, found) for key, the slot being empty when not found."""
+        table = self._table
+        mask = self._capacity - 1
+        slot = key[0] & mask
+        if self._words == 1:
+            word = key[0]
+            while True:
+                value = table[slot]
+                if value == word:
+                    return slot, True
+                if value == 0:
+                    return slot, False
+                slot = (slot + 1) & mask
+        low, high = key
+        while True:
+            value = table[2 * slot]
+            if value == low and table[2 * slot + 1] == high:
+                return slot, True
+            if value == 0 and table[2 * slot + 1] == 0:
+                return slot, False
+            slot = (slot + 1) & mask
+
+    def _store(self, slot: int, key: Tuple[int, ...]) -> None:
+        base = self._words * slot
+        for offset, word in enumerate(key):
+            self._table[base + offset] = word
+
+    def _grow(self) -> None:
+        """Double the table and reinsert all entries."""
+        old_table, words = self._table, self._words
+        self._capacity *= 2
+        self._table = array("Q", bytes(8 * words * self._capacity))
+        for base in range(0, len(old_table), words):
+            key = tuple(old_table[base : base + words])
+            if any(key):
+                self._store(self._find(key)[0], key)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return self._find(self._key(digest))[1]
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Insert a digest.
+
+        Args:
+            digest: Binary digest of digest_size bytes
+
+        Returns:
+            True if the digest was not present before
+        """
+        key = self._key(digest)
+        slot, found = self._find(key)
+        if found:
+            return False
+
+        self._store(slot, key)
+        self._size += 1
+        if self._size > self.max_load * self._capacity:
+            self._grow()
+        return True
+
+    def save(self, path: str) -> None:
+        """Atomically write the set to a file."""
+        header = {
+            "type": "DigestSet",
+            "digest_bits": self.digest_bits,
+            "max_load": self.max_load,
+            "capacity": self._capacity,
+            "size": self._size,
+        }
+        _write_state(path, header, self._table.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "DigestSet":
+        """Read a set written by save()."""
+        header, payload = _read_state(path, "DigestSet")
+        digest_set = cls(header["digest_bits"], header["capacity"], header["max_load"])
+        digest_set._table = array("Q")
+        digest_set._table.frombytes(payload)
+        digest_set._size = header["size"]
+        return digest_set
+
+
+class BloomFilter:
+    """
+    Bloom filter over 128-bit digests with a fixed capacity.
+
+    Membership answers may be false positives at roughly error_rate once
+    capacity items are inserted, so a small fraction of unique documents is
+    dropped in exchange for ~1.2 bytes per item at a 1% error rate.
+    """
+
+    digest_bits = 128
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Initialize an empty filter.
+
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false-positive rate at capacity
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._size = 0
+
+    @property
+    def digest_size(self) -> int:
+        """Digest width in bytes."""
+        return self.digest_bits // 8
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes used by the bit array."""
+        return len(self._bits)
+
+    def __len__(self) -> int:
+        """Number of items added as new (an estimate once false positives occur)."""
+        return self._size
+
+    def _positions(self, digest: bytes) -> List[int]:
+        """Derive bit positions by double hashing the two digest halves."""
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Insert a digest.
+
+        Args:
+            digest: 16-byte binary digest
+
+        Returns:
+            True if the digest was (probably) not present before
+        """
+        bits = self._bits
+        is_new = False
+        for p in self._positions(digest):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                is_new = True
+        if is_new:
+            self._size += 1
+        return is_new
+
+    def expected_error_rate(self) -> float:
+        """Estimated false-positive rate at the current fill level."""
+        k, m = self.num_hashes, self.num_bits
+        return (1.0 - math.exp(-k * self._size / m)) ** k
+
+    def save(self, path: str) -> None:
+        """Atomically write the filter to a file."""
+        header = {
+            "type": "BloomFilter",
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "size": self._size,
+        }
+        _write_state(path, header, bytes(self._bits))
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """Read a filter written by save()."""
+        header, payload = _read_state(path, "BloomFilter")
+        bloom = cls(header["capacity"], header["error_rate"])
+        bloom._bits = bytearray(payload)
+        bloom._size = header["size"]
+        return bloom
+
+
+def _write_state(path: str, header: Dict[str, Any], payload: bytes) -> None:
+    """Write a JSON header and raw payload to a temporary file, then move it."""
+    header_bytes = json.dumps(header).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_STATE_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_state(path: str, kind: str) -> Tuple[Dict[str, Any], bytes]:
+    """Read a file written by _write_state(), checking the stored type."""
+    with open(path, "rb") as f:
+        if f.read(len(_STATE_MAGIC)) != _STATE_MAGIC:
+            raise ValueError(f"{path} is not a BalNLP seen-set file")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        if header["type"] != kind:
+            raise ValueError(f"{path} holds a {header['type']}, not a {kind}")
+        return header, f.read()
@@ -0,0 +1,318 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Set
+
+import numpy as np
+
+_MANIFEST = "manifest.json"
+_SEGMENT_DTYPE = np.dtype("<u8")
+
+
+class DigestStore:
+    """
+    Persistent, append-only store of 64-bit document digests.
+
+    New digests are buffered in memory and flushed as immutable sorted
+    segment files; membership checks binary-search the memory-mapped
+    segments, so the history never has to fit in RAM. When more than
+    max_segments segments exist they are merged into one by a streaming
+    k-way merge.
+
+    state() captures the current segment list; rollback() returns the store
+    to such a state, which lets a crashed build resume from a checkpoint
+    without its dedup history containing documents written after it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_segments: int = 8,
+        flush_every: int = 1_000_000,
+        read_only: bool = False,
+        keep_replaced: bool = False,
+    ):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: Directory holding the manifest and segment files
+            max_segments: Number of segments that triggers a compaction
+            flush_every: Number of buffered digests that triggers a flush
+            read_only: Reject add() calls when True
+            keep_replaced: Keep segment files replaced by compaction until
+                discard_replaced() is called, so that a recorded state()
+                stays restorable
+        """
+        self.path = path
+        self.max_segments = max_segments
+        self.flush_every = flush_every
+        self.read_only = read_only
+        self.keep_replaced = keep_replaced
+        self._pending: Set[int] = set()
+        self._replaced: List[str] = []
+
+        manifest_path = os.path.join(path, _MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        elif read_only:
+            raise FileNotFoundError(f"No digest store found at {path}")
+        else:
+            os.makedirs(path, exist_ok=True)
+            manifest = {"segments": [], "next_id": 0}
+
+        self._segment_names: List[str] = manifest["segments"]
+        self._next_id: int = manifest["next_id"]
+        self._segments = [self._open_segment(name) for name in self._segment_names]
+
+    def __enter__(self) -> "DigestStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._segments) + len(self._pending)
+
+    def __contains__(self, digest: int) -> bool:
+        return bool(self.contains_many(np.array([digest], dtype=np.uint64))[0])
+
+    def _open_segment(self, name: str) -> np.ndarray:
+        path = os.path.join(self.path, name)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=_SEGMENT_DTYPE)
+        return np.memmap(path, dtype=_SEGMENT_DTYPE, mode="r")
+
+    def contains_many(self, digests: np.ndarray) -> np.ndarray:
+        """
+        Batched membership lookup.
+
+        Args:
+            digests: Array of uint64 digests
+
+        Returns:
+            Boolean array, True where the digest is already stored
+        """
+        digests = np.asarray(digests, dtype=np.uint64)
+        found = np.zeros(len(digests), dtype=bool)
+        for segment in self._segments:
+            if not len(segment):
+                continue
+            pos = np.searchsorted(segment, digests)
+            hit = pos < len(segment)
+            hit[hit] = segment[pos[hit]] == digests[hit]
+            found |= hit
+        if self._pending:
+            pending = self._pending
+            found |= np.fromiter(
+                (d in pending for d in digests.tolist()), dtype=bool, count=len(digests)
+            )
+        return found
+
+    def add_many(self, digests: np.ndarray) -> np.ndarray:
+        """
+        Add a batch of digests.
+
+        Args:
+            digests: Array of uint64 digests
+
+        Returns:
+            Boolean array, True for the first occurrence of each digest that
+            was not stored before
+        """
+        if self.read_only:
+            raise ValueError("Digest store was opened read-only")
+
+        digests = np.asarray(digests, dtype=np.uint64)
+        is_new = ~self.contains_many(digests)
+        # Only the first occurrence within the batch counts as new.
+        _, first = np.unique(digests, return_index=True)
+        first_mask = np.zeros(len(digests), dtype=bool)
+        first_mask[first] = True
+        is_new &= first_mask
+
+        self._pending.update(digests[is_new].tolist())
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return is_new
+
+    def add(self, digest: int) -> bool:
+        """Add one digest, returning True if it was not stored before."""
+        return bool(self.add_many(np.array([digest], dtype=np.uint64))[0])
+
+    def flush(self) -> None:
+        """Write buffered digests as a new sorted segment."""
+        if not self._pending:
+            return
+
+        digests = np.array(sorted(self._pending), dtype=_SEGMENT_DTYPE)
+        name = self._write_segment(digests)
+        self._segment_names.append(name)
+        self._segments.append(self._open_segment(name))
+        self._pending.clear()
+        self._write_manifest()
+
+        if len(self._segments) > self.max_segments:
+            self.compact()
+
+    def compact(self, block_size: int = 1 << 20) -> None:
+        """
+        Merge all segments into one without loading them into memory.
+
+        Args:
+            block_size: Digests read from each segment per merge step
+        """
+        if len(self._segments) <= 1:
+            return
+
+        name = self._new_segment_name()
+        tmp_path = os.path.join(self.path, name + ".tmp")
+        with open(tmp_path, "wb") as out:
+            for block in _merge_sorted(self._segments, block_size):
+                out.write(block.tobytes())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+        self._replaced.extend(self._segment_names)
+        self._segment_names = [name]
+        self._segments = [self._open_segment(name)]
+        self._write_manifest()
+        if not self.keep_replaced:
+            self.discard_replaced()
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Flush buffered digests and describe the store's current contents.
+
+        Returns:
+            JSON-serializable state accepted by rollback()
+        """
+        self.flush()
+        return {"segments": list(self._segment_names), "next_id": self._next_id}
+
+    def discard_replaced(self, keep: Iterable[str] = ()) -> None:
+        """
+        Delete segment files that compaction has replaced.
+
+        Args:
+            keep: Segment names to leave on disk (e.g. those of an older
+                state() that may still be rolled back to); they stay listed
+                for a later call
+        """
+        keep = set(keep)
+        for name in self._replaced:
+            path = os.path.join(self.path, name)
+            if name not in keep and os.path.exists(path):
+                os.remove(path)
+        self._replaced = [name for name in self._replaced if name in keep]
+
+    def rollback(self, state: Dict[str, Any], keep: Iterable[str] = ()) -> None:
+        """
+        Return the store to a state() recorded earlier.
+
+        Digests added after that state are forgotten and every segment file
+        not part of it is deleted. The recorded segments must still exist,
+        which keep_replaced guarantees until discard_replaced() is called.
+
+        Args:
+            state: Dictionary returned by state()
+            keep: Segment names to leave on disk although they are not part
+                of state; they are deleted by the next discard_replaced()
+        """
+        if self.read_only:
+            raise ValueError("Digest store was opened read-only")
+
+        names = list(state["segments"])
+        missing = [n for n in names if not os.path.exists(os.path.join(self.path, n))]
+        if missing:
+            raise FileNotFoundError(f"Digest store segments {missing} no longer exist")
+
+        self._pending.clear()
+        self._segment_names = names
+        self._segments = [self._open_segment(name) for name in names]
+        self._next_id = max(self._next_id, state["next_id"])
+        self._write_manifest()
+
+        live = set(names)
+        keep = set(keep)
+        self._replaced = []
+        for name in os.listdir(self.path):
+            if not name.startswith("segment-") or name in live:
+                continue
+            if name in keep:
+                self._replaced.append(name)
+            else:
+                os.remove(os.path.join(self.path, name))
+
+    def close(self) -> None:
+        """Flush buffered digests."""
+        if not self.read_only:
+            self.flush()
+
+    def _new_segment_name(self) -> str:
+        name = f"segment-{self._next_id:06d}.u64"
+        self._next_id += 1
+        return name
+
+    def _write_segment(self, digests: np.ndarray) -> str:
+        name = self._new_segment_name()
+        path = os.path.join(self.path, name)
+        with open(path + ".tmp", "wb") as f:
+            f.write(digests.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        return name
+
+    def _write_manifest(self) -> None:
+        """Atomically replace the manifest listing the live segments."""
+        path = os.path.join(self.path, _MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segment_names, "next_id": self._next_id}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+
+def _merge_sorted(arrays: List[np.ndarray], block_size: int) -> Iterable[np.ndarray]:
+    """
+    Stream the sorted union of sorted arrays in bounded-size blocks.
+
+    Each step reads up to block_size values from every array, emits all
+    values not larger than the smallest block end (they cannot be preceded by
+    anything still unread) and drops values equal to the last one emitted.
+    """
+    positions = [0] * len(arrays)
+    last = None
+    while True:
+        blocks = []
+        bound = None
+        for array, pos in zip(arrays, positions):
+            if pos < len(array):
+                block = np.asarray(array[pos : pos + block_size])
+                blocks.append(block)
+                end = block[-1] if pos + block_size < len(array) else None
+                if end is not None and (bound is None or end < bound):
+                    bound = end
+            else:
+                blocks.append(None)
+        if all(b is None for b in blocks):
+            return
+
+        taken = []
+        for i, block in enumerate(blocks):
+            if block is None:
+                continue
+            count = (
+                len(block) if bound is None else np.searchsorted(block, bound, "right")
+            )
+            taken.append(block[:count])
+            positions[i] += int(count)
+
+        merged = np.unique(np.concatenate(taken))
+        if last is not None and len(merged) and merged[0] == last:
+            merged = merged[1:]
+        if len(merged):
+            last = merged[-1]
+            yield merged.astype(_SEGMENT_DTYPE, copy=False)
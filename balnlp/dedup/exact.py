@@ -1,6 +1,23 @@
 import hashlib
+import sys
 import unicodedata
-from typing import Iterable, List, Set
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union
+
+import numpy as np
+
+from .digest_set import BloomFilter, DigestSet
+from .digest_store import DigestStore
+
+KEY_NORMALIZATIONS = ("nfc", "whitespace", "casefold", "diacritics")
+
+
+@lru_cache(maxsize=None)
+def _combining_marks_table() -> Dict[int, None]:
+    """Translation table deleting every combining mark (built once)."""
+    return {
+        cp: None for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))
+    }
 
 
 class ExactDedup:
@@ -8,6 +25,179 @@ class ExactDedup:
     Remove exact duplicate documents using various normalization techniques.
     """
 
+    def __init__(
+        self,
+        digest_bits: int = 64,
+        use_bloom: bool = False,
+        bloom_capacity: int = 10_000_000,
+        error_rate: float = 0.001,
+        key_normalizations: Iterable[str] = ("nfc", "whitespace"),
+        store: Optional[DigestStore] = None,
+    ):
+        """
+        Initialize the deduplicator.
+
+        The remove_* methods are stateless and return lists. process_single()
+        and iter_unique() remember every document they have seen in a compact
+        binary seen-set, so they can stream corpora larger than memory.
+
+        Args:
+            digest_bits: Width of the stored digests for the seen-set (64 or 128)
+            use_bloom: Use a Bloom filter instead of an exact digest table.
+                Uses less memory but drops unique documents at error_rate.
+            bloom_capacity: Number of distinct documents the Bloom filter is sized for
+            error_rate: Bloom filter false-positive rate at bloom_capacity
+            key_normalizations: Normalizations combined into the canonical key
+                used by iter_all_unique(), any of "nfc", "whitespace",
+                "casefold" and "diacritics"
+            store: Persistent digest store shared across runs. When given,
+                process_single() and iter_unique() check and record documents
+                in the store instead of the in-memory seen-set (64-bit digests).
+        """
+        unknown = set(key_normalizations) - set(KEY_NORMALIZATIONS)
+        if unknown:
+            raise ValueError(
+                f"Unknown key normalizations {sorted(unknown)}, "
+                f"choose from {KEY_NORMALIZATIONS}"
+            )
+
+        self.digest_bits = digest_bits
+        self.use_bloom = use_bloom
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.key_normalizations = frozenset(key_normalizations)
+        self.store = store
+        if store is not None and (use_bloom or digest_bits != 64):
+            raise ValueError("A digest store requires 64-bit digests without Bloom")
+        self.seen = self.new_seen_set()
+
+    def new_seen_set(self) -> Union[DigestSet, BloomFilter]:
+        """Create an empty seen-set with this deduplicator's settings."""
+        if self.use_bloom:
+            return BloomFilter(self.bloom_capacity, self.error_rate)
+        return DigestSet(self.digest_bits)
+
+    def save_state(self, path: str) -> None:
+        """
+        Save the in-memory seen-set used by process_single() and iter_unique().
+
+        Args:
+            path: Destination file (a digest store persists itself instead)
+        """
+        self.seen.save(path)
+
+    def load_state(self, path: str) -> None:
+        """
+        Replace the seen-set with one written by save_state().
+
+        Args:
+            path: File written by save_state()
+        """
+        seen = BloomFilter.load(path) if self.use_bloom else DigestSet.load(path)
+        if seen.digest_bits != self.seen.digest_bits:
+            raise ValueError(
+                f"{path} holds {seen.digest_bits}-bit digests, "
+                f"expected {self.seen.digest_bits}"
+            )
+        self.seen = seen
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory used by the seen-set, in bytes."""
+        return self.seen.memory_bytes
+
+    def canonical_key(self, text: str) -> str:
+        """
+        Apply the configured key normalizations in one pass.
+
+        Diacritic folding decomposes the text, drops combining marks (e.g.
+        zabar, zer, pesh) and recomposes it, which also implies NFC.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Canonical form used as the deduplication key
+        """
+        steps = self.key_normalizations
+        if "diacritics" in steps:
+            text = unicodedata.normalize("NFD", text)
+            text = text.translate(_combining_marks_table())
+            text = unicodedata.normalize("NFC", text)
+        elif "nfc" in steps:
+            text = unicodedata.normalize("NFC", text)
+        if "casefold" in steps:
+            text = text.casefold()
+        if "whitespace" in steps:
+            text = " ".join(text.split())
+        return text
+
+    def digest(self, text: str) -> bytes:
+        """
+        Compute the fixed-width binary digest stored in the seen-set.
+
+        Args:
+            text: Input text to hash
+
+        Returns:
+            BLAKE2b digest of the seen-set's digest size
+        """
+        return hashlib.blake2b(
+            text.encode("utf-8"), digest_size=self.seen.digest_size
+        ).digest()
+
+    def process_single(self, text: str) -> bool:
+        """
+        Check one document against everything seen so far and remember it.
+
+        Args:
+            text: Document to check
+
+        Returns:
+            True if the document is new, False if it is an exact duplicate
+        """
+        if self.store is not None:
+            return self.store.add(int.from_bytes(self.digest(text), "little"))
+        return self.seen.add(self.digest(text))
+
+    def iter_unique(
+        self, documents: Iterable[str], batch_size: int = 4096
+    ) -> Iterator[str]:
+        """
+        Stream documents, yielding the first occurrence of each one.
+
+        Args:
+            documents: iterable of text documents, consumed lazily
+            batch_size: Documents looked up in the digest store per batch
+
+        Yields:
+            documents not seen before (in this call, earlier ones, or earlier
+            runs sharing the digest store)
+        """
+        if self.store is None:
+            add, digest = self.seen.add, self.digest
+            for doc in documents:
+                if add(digest(doc)):
+                    yield doc
+            return
+
+        batch: List[str] = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield from self._store_batch(batch)
+                batch = []
+        if batch:
+            yield from self._store_batch(batch)
+
+    def _store_batch(self, batch: List[str]) -> List[str]:
+        """Check and record one batch of documents in the digest store."""
+        digests = np.frombuffer(
+            b"".join(self.digest(doc) for doc in batch), dtype="<u8"
+        )
+        is_new = self.store.add_many(digests)  # type: ignore[union-attr]
+        return [doc for doc, new in zip(batch, is_new.tolist()) if new]
+
     @staticmethod
     def sha1_hash(text: str) -> str:
         """
@@ -113,16 +303,51 @@ class ExactDedup:
 
         return unique
 
-    def remove_all_duplicates(self, documents: Iterable[str]) -> List[str]:
+    def iter_all_unique(
+        self,
+        documents: Iterable[str],
+        seen: Optional[Union[DigestSet, BloomFilter]] = None,
+    ) -> Iterator[str]:
+        """
+        Single-pass fused deduplication on the canonical key.
+
+        Each document is normalized and hashed once; the first document of
+        each canonical key is yielded unchanged. Unlike the three chained
+        passes of remove_all_duplicates(), two documents are duplicates
+        exactly when their keys match under all key_normalizations together.
+
+        Args:
+            documents: iterable of text documents, consumed lazily
+            seen: Seen-set to use, a fresh one per call by default (pass
+                self.seen to share state with process_single())
+
+        Yields:
+            unique documents in first occurrence order
+        """
+        if seen is None:
+            seen = self.new_seen_set()
+        add, digest, key = seen.add, self.digest, self.canonical_key
+        for doc in documents:
+            if add(digest(key(doc))):
+                yield doc
+
+    def remove_all_duplicates(
+        self, documents: Iterable[str], fused: bool = False
+    ) -> List[str]:
         """
         Remove duplicates using all normalization methods in sequence.
 
         Args:
             documents: iterable of text documents
+            fused: Deduplicate in a single pass on the canonical key instead
+                (see iter_all_unique())
 
         Returns:
             list of unique documents after applying all normalization methods
         """
+        if fused:
+            return list(self.iter_all_unique(documents))
+
         # Apply Unicode normalization first
         step1 = self.remove_normalized_duplicates(documents)
         # Then apply whitespace normalization
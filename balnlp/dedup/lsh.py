@@ -0,0 +1,282 @@
+import json
+import os
+import struct
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+_INDEX_MAGIC = b"BALNLSH1"
+_ALIGNMENT = 64
+
+# Fixed odd multipliers used to fold a band of signature rows into one key.
+_BAND_MULTIPLIERS = np.random.RandomState(0x5EED).randint(
+    1, np.iinfo(np.int64).max, size=1024, dtype=np.int64
+).astype(np.uint64) | np.uint64(1)
+
+
+def _integrate(values: np.ndarray, points: np.ndarray) -> float:
+    """Trapezoidal integration of sampled values."""
+    return float(np.sum((values[1:] + values[:-1]) * np.diff(points)) / 2.0)
+
+
+def optimal_lsh_params(
+    threshold: float,
+    num_perm: int,
+    false_positive_weight: float = 0.5,
+    false_negative_weight: float = 0.5,
+) -> Tuple[int, int]:
+    """
+    Choose the (bands, rows) split that best approximates a Jaccard threshold.
+
+    Args:
+        threshold: Jaccard similarity above which documents should collide
+        num_perm: Number of MinHash permutations in each signature
+        false_positive_weight: Weight of the false positive probability
+        false_negative_weight: Weight of the false negative probability
+
+    Returns:
+        Tuple of (bands, rows) with bands * rows <= num_perm
+    """
+    below = np.linspace(0.0, threshold, 101)
+    above = np.linspace(threshold, 1.0, 101)
+
+    best = (1, num_perm)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        max_rows = num_perm // bands
+        for rows in range(1, max_rows + 1):
+            fp = _integrate(1.0 - (1.0 - below**rows) ** bands, below)
+            fn = _integrate((1.0 - above**rows) ** bands, above)
+            error = false_positive_weight * fp + false_negative_weight * fn
+            if error < best_error:
+                best_error = error
+                best = (bands, rows)
+    return best
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing index over MinHash signatures."""
+
+    def __init__(self, num_perm: int, bands: int, rows: int):
+        if bands * rows > num_perm:
+            raise ValueError(
+                f"bands * rows ({bands} * {rows}) exceeds num_perm ({num_perm})"
+            )
+        if rows > len(_BAND_MULTIPLIERS):
+            raise ValueError(f"rows must be at most {len(_BAND_MULTIPLIERS)}")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = rows
+        self.read_only = False
+        self.metadata: Dict[str, Any] = {}
+
+        # Entries loaded from disk: memory-mapped and sorted by band key.
+        self._base_size = 0
+        self._base_signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._base_keys = np.empty((bands, 0), dtype=np.uint64)
+        self._base_ids = np.empty((bands, 0), dtype=np.int64)
+
+        # Entries inserted since then, kept in memory.
+        self._signatures = np.empty((64, num_perm), dtype=np.uint32)
+        self._size = 0
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return self._base_size + self._size
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        Fold each band of one or more signatures into a 64-bit bucket key.
+
+        Args:
+            signatures: Signature of shape (num_perm,) or (n, num_perm)
+
+        Returns:
+            Array of shape (bands,) or (n, bands) with dtype uint64
+        """
+        sigs = np.atleast_2d(signatures)[:, : self.bands * self.rows]
+        sigs = sigs.reshape(len(sigs), self.bands, self.rows).astype(np.uint64)
+        keys = (sigs * _BAND_MULTIPLIERS[: self.rows]).sum(axis=2, dtype=np.uint64)
+        return keys[0] if np.ndim(signatures) == 1 else keys
+
+    def candidates(self, signature: np.ndarray) -> List[int]:
+        """Return ids of indexed signatures sharing at least one band bucket."""
+        keys = self.band_keys(signature)
+        found = set()
+        if self._base_size:
+            for band, key in enumerate(keys):
+                band_keys = self._base_keys[band]
+                lo = np.searchsorted(band_keys, key, side="left")
+                hi = np.searchsorted(band_keys, key, side="right")
+                if hi > lo:
+                    found.update(self._base_ids[band, lo:hi].tolist())
+        for table, key in zip(self._tables, keys.tolist()):
+            bucket = table.get(key)
+            if bucket:
+                found.update(bucket)
+        return sorted(found)
+
+    def signatures(self, ids: List[int]) -> np.ndarray:
+        """Return the stored signatures for the given ids."""
+        ids_arr = np.asarray(ids, dtype=np.int64)
+        rows = np.empty((len(ids_arr), self.num_perm), dtype=np.uint32)
+        in_base = ids_arr < self._base_size
+        rows[in_base] = self._base_signatures[ids_arr[in_base]]
+        rows[~in_base] = self._signatures[ids_arr[~in_base] - self._base_size]
+        return rows
+
+    def similarity(self, signature: np.ndarray, ids: List[int]) -> np.ndarray:
+        """Estimate Jaccard similarity between a signature and indexed entries."""
+        if not ids:
+            return np.empty(0, dtype=np.float64)
+        return np.mean(self.signatures(ids) == signature, axis=1)
+
+    def insert(self, signature: np.ndarray) -> int:
+        """
+        Add a signature to the index.
+
+        Args:
+            signature: MinHash signature of shape (num_perm,)
+
+        Returns:
+            Id assigned to the signature (its insertion position)
+        """
+        if self.read_only:
+            raise ValueError("LSH index was opened read-only")
+
+        if self._size == len(self._signatures):
+            grown = np.empty((2 * self._size, self.num_perm), dtype=np.uint32)
+            grown[: self._size] = self._signatures
+            self._signatures = grown
+
+        doc_id = len(self)
+        self._signatures[self._size] = signature
+        self._size += 1
+
+        for table, key in zip(self._tables, self.band_keys(signature).tolist()):
+            table.setdefault(key, []).append(doc_id)
+        return doc_id
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a single memory-mappable file.
+
+        Entries loaded from disk are merged with newly inserted ones; only the
+        new signatures are hashed into band keys, the existing sorted bucket
+        arrays are merged in one linear pass. The file is written to a
+        temporary path first and atomically moved into place.
+
+        Args:
+            path: Destination file path
+        """
+        new_signatures = self._signatures[: self._size]
+        new_ids = np.arange(self._base_size, len(self), dtype=np.int64)
+        new_keys = self.band_keys(new_signatures).reshape(self._size, self.bands).T
+
+        keys = np.empty((self.bands, len(self)), dtype=np.uint64)
+        ids = np.empty((self.bands, len(self)), dtype=np.int64)
+        for band in range(self.bands):
+            order = np.argsort(new_keys[band], kind="stable")
+            band_new_keys = new_keys[band][order]
+            positions = np.searchsorted(
+                self._base_keys[band], band_new_keys, side="right"
+            )
+            keys[band] = np.insert(self._base_keys[band], positions, band_new_keys)
+            ids[band] = np.insert(self._base_ids[band], positions, new_ids[order])
+
+        arrays = {
+            "signatures": np.concatenate([self._base_signatures, new_signatures]),
+            "keys": keys,
+            "ids": ids,
+        }
+
+        header: Dict[str, Any] = {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "size": len(self),
+            "metadata": self.metadata,
+            "arrays": {},
+        }
+        # Array offsets depend on the header length; iterate until stable.
+        while True:
+            header_bytes = json.dumps(header).encode("utf-8")
+            offset = _align(len(_INDEX_MAGIC) + 8 + len(header_bytes))
+            layout = {}
+            for name, array in arrays.items():
+                layout[name] = {
+                    "offset": offset,
+                    "shape": list(array.shape),
+                    "dtype": array.dtype.str,
+                }
+                offset = _align(offset + array.nbytes)
+            if layout == header["arrays"]:
+                break
+            header["arrays"] = layout
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_INDEX_MAGIC)
+            f.write(struct.pack("<Q", len(header_bytes)))
+            f.write(header_bytes)
+            for name, array in arrays.items():
+                f.seek(header["arrays"][name]["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, read_only: bool = False) -> "LSHIndex":
+        """
+        Open an index written by save() without reading it into memory.
+
+        Args:
+            path: Index file path
+            read_only: Reject insert() calls when True
+
+        Returns:
+            LSHIndex backed by memory-mapped arrays; inserts are kept in
+            memory until the next save()
+        """
+        header = read_index_header(path)
+        index = cls(header["num_perm"], header["bands"], header["rows"])
+        index.metadata = header["metadata"]
+        index.read_only = read_only
+
+        arrays: Dict[str, np.ndarray] = {}
+        for name, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            if 0 in shape:
+                arrays[name] = np.empty(shape, dtype=spec["dtype"])
+            else:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=spec["dtype"],
+                    mode="r",
+                    offset=spec["offset"],
+                    shape=shape,
+                )
+
+        index._base_size = header["size"]
+        index._base_signatures = arrays["signatures"]
+        index._base_keys = arrays["keys"]
+        index._base_ids = arrays["ids"]
+        return index
+
+
+def read_index_header(path: str) -> Dict[str, Any]:
+    """Read the JSON header of an index file written by LSHIndex.save()."""
+    with open(path, "rb") as f:
+        if f.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+            raise ValueError(f"{path} is not a BalNLP LSH index file")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the array alignment."""
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
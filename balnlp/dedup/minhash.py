@@ -1,17 +1,112 @@
-from typing import List, Set, Tuple, Union
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .lsh import LSHIndex, optimal_lsh_params, read_index_header
+
+Shingles = Union[Set[Tuple[str, ...]], Set[str]]
+Fingerprint = Tuple[Optional[Shingles], Optional[np.ndarray]]
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """Compute MinHash signatures of shingle sets with vectorized hashing."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def hash_shingles(shingles: Iterable[Union[Tuple[str, ...], str]]) -> np.ndarray:
+        """Hash shingles to stable 32-bit values (independent of PYTHONHASHSEED)."""
+        return np.fromiter(
+            (
+                zlib.crc32(
+                    (" ".join(sh) if isinstance(sh, tuple) else sh).encode("utf-8")
+                )
+                for sh in shingles
+            ),
+            dtype=np.uint64,
+        )
+
+    def signature(self, shingles: Shingles) -> np.ndarray:
+        """
+        Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Non-empty set of word or character shingles
+
+        Returns:
+            Array of shape (num_perm,) with dtype uint32
+        """
+        hv = self.hash_shingles(shingles)[:, np.newaxis]
+        phv = ((hv * self.a + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return phv.min(axis=0).astype(np.uint32)
 
 
 class NearDedup:
     """Remove near duplicates using Jaccard similarity over shingles."""
 
     def __init__(
-        self, shingle_size: int = 1, threshold: float = 0.4, mode: str = "word"
+        self,
+        shingle_size: int = 1,
+        threshold: float = 0.4,
+        mode: str = "word",
+        method: str = "jaccard",
+        num_perm: int = 128,
+        bands: Optional[int] = None,
+        rows: Optional[int] = None,
+        verify: bool = False,
+        seed: int = 1,
     ):
+        """
+        Initialize the near-duplicate remover.
+
+        Args:
+            shingle_size: Number of words or characters per shingle
+            threshold: Jaccard similarity at or above which a document is a duplicate
+            mode: "word" or "char" shingling
+            method: "jaccard" compares against every kept document,
+                "minhash" looks candidates up in an LSH banding index
+            num_perm: Number of MinHash permutations (minhash method only)
+            bands: Number of LSH bands, derived from threshold when omitted
+            rows: Rows per LSH band, derived from threshold when omitted
+            verify: Confirm LSH candidates with exact Jaccard instead of the
+                signature estimate (keeps the shingle sets in memory)
+            seed: Seed of the MinHash permutations
+        """
+        if method not in ("jaccard", "minhash"):
+            raise ValueError(f"Unknown method '{method}', use 'jaccard' or 'minhash'")
+
         self.shingle_size = shingle_size
         self.threshold = threshold
         self.mode = mode
+        self.method = method
+        self.verify = verify
 
-    def shingles(self, text: str) -> Union[Set[Tuple[str, ...]], Set[str]]:
+        # State kept across process_single() calls.
+        self.index: Optional[LSHIndex] = None
+        self._kept_shingles: Dict[int, Shingles] = {}
+        self._seen_shingles: List[Shingles] = []
+
+        if method == "minhash":
+            if bands is None or rows is None:
+                bands, rows = optimal_lsh_params(threshold, num_perm)
+            self.minhasher = MinHasher(num_perm=num_perm, seed=seed)
+            self.bands = bands
+            self.rows = rows
+
+    def shingles(self, text: str) -> Shingles:
         """Generate shingles based on selected mode."""
         if self.mode == "word":
             return self._word_shingles(text)
@@ -46,11 +141,284 @@ class NearDedup:
         union = len(set1 | set2)
         return intersection / union if union > 0 else 0.0
 
+    def new_index(self) -> LSHIndex:
+        """Create an empty LSH index matching this deduplicator's settings."""
+        index = LSHIndex(self.minhasher.num_perm, self.bands, self.rows)
+        index.metadata = {
+            "shingle_size": self.shingle_size,
+            "threshold": self.threshold,
+            "mode": self.mode,
+            "seed": self.minhasher.seed,
+        }
+        return index
+
+    def _is_indexed_duplicate(
+        self,
+        sh: Shingles,
+        signature: np.ndarray,
+        index: LSHIndex,
+        kept_shingles: Dict[int, Shingles],
+    ) -> bool:
+        """Check LSH candidates against the threshold."""
+        candidates = index.candidates(signature)
+        if not candidates:
+            return False
+        if self.verify:
+            # Entries loaded from disk have no shingles, fall back to the estimate.
+            estimated = [i for i in candidates if i not in kept_shingles]
+            if any(
+                self.jaccard(sh, kept_shingles[i]) >= self.threshold
+                for i in candidates
+                if i in kept_shingles
+            ):
+                return True
+            candidates = estimated
+        return bool(np.any(index.similarity(signature, candidates) >= self.threshold))
+
+    def fingerprint(self, doc: str) -> Fingerprint:
+        """
+        Compute everything the duplicate decision needs for one document.
+
+        Args:
+            doc: Input document
+
+        Returns:
+            Tuple of (shingles, signature). Shingles are None in minhash mode
+            without verify; the signature is None in jaccard mode and for
+            documents without shingles.
+        """
+        sh = self.shingles(doc)
+        if self.method != "minhash":
+            return sh, None
+        signature = self.minhasher.signature(sh) if sh else None
+        return (sh if self.verify else None), signature
+
+    def _accept_fingerprint(
+        self,
+        fingerprint: Fingerprint,
+        index: Optional[LSHIndex],
+        kept_shingles: Dict[int, Shingles],
+        seen_shingles: List[Shingles],
+        insert: bool = True,
+    ) -> bool:
+        """Return True if the fingerprint is new, optionally recording it."""
+        sh, signature = fingerprint
+
+        if self.method != "minhash":
+            if any(self.jaccard(sh, old) >= self.threshold for old in seen_shingles):
+                return False
+            if insert:
+                seen_shingles.append(sh)
+            return True
+
+        # Empty shingle sets have zero similarity to everything.
+        if signature is None:
+            return True
+        if self._is_indexed_duplicate(sh, signature, index, kept_shingles):
+            return False
+
+        if insert:
+            doc_id = index.insert(signature)
+            if self.verify:
+                kept_shingles[doc_id] = sh
+        return True
+
+    def _remove_with_minhash(self, documents: List[str]) -> List[str]:
+        """Remove near duplicates using MinHash signatures and LSH lookups."""
+        index = self.new_index()
+        kept_shingles: Dict[int, Shingles] = {}
+        unique: List[str] = []
+
+        for doc in documents:
+            if not doc or not doc.strip():
+                continue
+            fingerprint = self.fingerprint(doc)
+            if self._accept_fingerprint(fingerprint, index, kept_shingles, []):
+                unique.append(doc)
+
+        return unique
+
+    def remove_near_duplicates_parallel(
+        self,
+        documents: Iterable[str],
+        num_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> List[str]:
+        """
+        Remove near-duplicate documents, fingerprinting shards on a process pool.
+
+        Workers compute shingles and MinHash signatures per chunk; this process
+        merges the chunks in input order and makes every duplicate decision, so
+        the result equals remove_near_duplicates() for any worker count.
+        Documents are read lazily, with a bounded number of chunks in flight.
+
+        Only the "minhash" method is supported: in "jaccard" mode every
+        document is compared with every kept one in this process, which
+        workers cannot speed up; use remove_near_duplicates() there.
+
+        Args:
+            documents: iterable of text documents
+            num_workers: Number of worker processes (default: CPU count)
+            chunk_size: Documents per task; larger chunks lower scheduling
+                overhead, smaller ones keep workers evenly loaded
+
+        Returns:
+            list of documents kept, in first-occurrence order
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if self.method != "minhash":
+            raise ValueError(
+                "remove_near_duplicates_parallel() requires the 'minhash' method"
+            )
+
+        index = self.new_index()
+        kept_shingles: Dict[int, Shingles] = {}
+        unique: List[str] = []
+
+        docs = (doc for doc in documents if doc and doc.strip())
+        chunks = iter(lambda: list(islice(docs, chunk_size)), [])
+
+        def accept(chunk: List[str], fingerprints: List[Fingerprint]) -> None:
+            for doc, fingerprint in zip(chunk, fingerprints):
+                if self._accept_fingerprint(fingerprint, index, kept_shingles, []):
+                    unique.append(doc)
+
+        if num_workers == 1:
+            for chunk in chunks:
+                accept(chunk, [self.fingerprint(doc) for doc in chunk])
+            return unique
+
+        max_pending = 2 * (num_workers or os.cpu_count() or 1)
+        pending: deque = deque()
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_fingerprint_worker,
+            initargs=(self._settings(),),
+        ) as pool:
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(_fingerprint_chunk, chunk)))
+                if len(pending) >= max_pending:
+                    chunk, future = pending.popleft()
+                    accept(chunk, future.result())
+            while pending:
+                chunk, future = pending.popleft()
+                accept(chunk, future.result())
+
+        return unique
+
+    def _settings(self) -> Dict[str, object]:
+        """Constructor arguments reproducing this deduplicator without state."""
+        settings: Dict[str, object] = {
+            "shingle_size": self.shingle_size,
+            "threshold": self.threshold,
+            "mode": self.mode,
+            "method": self.method,
+            "verify": self.verify,
+        }
+        if self.method == "minhash":
+            settings.update(
+                num_perm=self.minhasher.num_perm,
+                bands=self.bands,
+                rows=self.rows,
+                seed=self.minhasher.seed,
+            )
+        return settings
+
+    def process_single(self, text: str) -> bool:
+        """
+        Check one document against everything seen so far and remember it.
+
+        Unlike remove_near_duplicates(), state is kept across calls (and across
+        runs when an index is loaded with load_index()).
+
+        Args:
+            text: Document to check
+
+        Returns:
+            True if the document is new and was recorded, False if it is empty
+            or a near duplicate of an earlier document
+        """
+        if not text or not text.strip():
+            return False
+
+        if self.method == "minhash" and self.index is None:
+            self.index = self.new_index()
+        return self._accept_fingerprint(
+            self.fingerprint(text), self.index, self._kept_shingles, self._seen_shingles
+        )
+
+    def process_batch(self, documents: Iterable[str]) -> List[str]:
+        """Run process_single() over documents and return the ones kept."""
+        return [doc for doc in documents if self.process_single(doc)]
+
+    def is_duplicate(self, text: str) -> bool:
+        """Check a document against the seen state without recording it."""
+        if not text or not text.strip():
+            return False
+
+        if self.method == "minhash" and self.index is None:
+            return False
+        return not self._accept_fingerprint(
+            self.fingerprint(text),
+            self.index,
+            self._kept_shingles,
+            self._seen_shingles,
+            insert=False,
+        )
+
+    def save_index(self, path: str) -> None:
+        """
+        Save the MinHash/LSH state built by process_single() to a file.
+
+        Args:
+            path: Index file path, see LSHIndex.save()
+        """
+        if self.method != "minhash":
+            raise ValueError("Only the 'minhash' method has a persistent index")
+        if self.index is None:
+            self.index = self.new_index()
+        self.index.save(path)
+
+    @classmethod
+    def load_index(
+        cls, path: str, read_only: bool = False, verify: bool = False
+    ) -> "NearDedup":
+        """
+        Reopen a saved index, restoring the settings it was built with.
+
+        Args:
+            path: Index file written by save_index()
+            read_only: Only allow is_duplicate() queries
+            verify: Use exact Jaccard for documents added after loading
+
+        Returns:
+            NearDedup in minhash mode backed by the memory-mapped index
+        """
+        header = read_index_header(path)
+        meta = header["metadata"]
+        dedup = cls(
+            shingle_size=meta["shingle_size"],
+            threshold=meta["threshold"],
+            mode=meta["mode"],
+            method="minhash",
+            num_perm=header["num_perm"],
+            bands=header["bands"],
+            rows=header["rows"],
+            verify=verify,
+            seed=meta["seed"],
+        )
+        dedup.index = LSHIndex.load(path, read_only=read_only)
+        return dedup
+
     def remove_near_duplicates(self, documents: List[str]) -> List[str]:
         """Remove near-duplicate documents."""
         if not documents:
             return []
 
+        if self.method == "minhash":
+            return self._remove_with_minhash(documents)
+
         unique: List[str] = []
         seen_shingles: List[Union[Set[Tuple[str, ...]], Set[str]]] = []  # Fixed type
 
@@ -72,3 +440,18 @@ class NearDedup:
                 unique.append(doc)
 
         return unique
+
+
+# Per-process deduplicator used by remove_near_duplicates_parallel() workers.
+_worker_dedup: Optional[NearDedup] = None
+
+
+def _init_fingerprint_worker(settings: Dict[str, object]) -> None:
+    """Build the worker's stateless deduplicator once per process."""
+    global _worker_dedup
+    _worker_dedup = NearDedup(**settings)  # type: ignore[arg-type]
+
+
+def _fingerprint_chunk(documents: List[str]) -> List[Fingerprint]:
+    """Fingerprint one chunk of documents inside a worker process."""
+    return [_worker_dedup.fingerprint(doc) for doc in documents]  # type: ignore
@@ -0,0 +1,143 @@
+"""
+Data-parallel training across the local XLA devices.
+
+Each global batch is split along its first axis over a one-dimensional
+device mesh. Every device computes the loss and gradients of its part, the
+results are averaged with an all-reduce (jax.lax.pmean) and the optimizer
+update then runs on replicated parameters, so every device holds the same
+model after each step. Since all parts have the same size, the averaged
+loss and gradients are those of the whole batch on a single device.
+
+On CPU hosts XLA exposes one device unless told otherwise; set
+XLA_FLAGS=--xla_force_host_platform_device_count=N before JAX initializes
+its backend (see set_host_device_count()).
+"""
+
+import os
+from typing import Any, Callable, Optional, Tuple
+
+import equinox as eqx
+import jax
+import numpy as np
+from jax.sharding import Mesh, NamedSharding, PartitionSpec
+
+try:
+    from jax import shard_map
+except ImportError:  # JAX < 0.6
+    from jax.experimental.shard_map import shard_map
+
+DATA_AXIS = "data"
+
+
+def set_host_device_count(num_devices: int) -> None:
+    """
+    Make XLA split the host CPU into num_devices devices.
+
+    Only takes effect when called before JAX initializes its backend (the
+    first jax.devices() call or computation), not merely before import.
+    """
+    flag = "--xla_force_host_platform_device_count"
+    flags = [
+        f for f in os.environ.get("XLA_FLAGS", "").split() if not f.startswith(flag)
+    ]
+    os.environ["XLA_FLAGS"] = " ".join(flags + [f"{flag}={num_devices}"])
+
+
+def make_mesh(num_devices: Optional[int] = None, axis_name: str = DATA_AXIS) -> Mesh:
+    """
+    One-dimensional mesh over the first num_devices local devices.
+
+    Args:
+        num_devices: Devices to train on (None: all local devices)
+        axis_name: Name of the batch axis
+    """
+    devices = jax.local_devices()
+    if num_devices is None:
+        num_devices = len(devices)
+    if not 1 <= num_devices <= len(devices):
+        raise ValueError(
+            f"Cannot use {num_devices} devices; {len(devices)} are available"
+        )
+    return Mesh(np.array(devices[:num_devices]), (axis_name,))
+
+
+def batch_sharding(mesh: Mesh, axis_name: str = DATA_AXIS) -> NamedSharding:
+    """Sharding that splits the first axis of a batch over the mesh."""
+    return NamedSharding(mesh, PartitionSpec(axis_name))
+
+
+def replicated(mesh: Mesh) -> NamedSharding:
+    """Sharding that keeps a full copy on every device of the mesh."""
+    return NamedSharding(mesh, PartitionSpec())
+
+
+def shard_batch(
+    mesh: Mesh, axis_name: str = DATA_AXIS
+) -> Callable[[np.ndarray], jax.Array]:
+    """
+    Transfer function for BatchLoader that splits each batch over the mesh.
+
+    The batch size must be divisible by the number of devices.
+    """
+    sharding = batch_sharding(mesh, axis_name)
+    num_devices = mesh.shape[axis_name]
+
+    def transfer(array: np.ndarray) -> jax.Array:
+        if len(array) % num_devices:
+            raise ValueError(
+                f"Batch of {len(array)} cannot be split over {num_devices} devices"
+            )
+        return jax.device_put(array, sharding)
+
+    return transfer
+
+
+def replicate(tree: Any, mesh: Mesh) -> Any:
+    """Copy the arrays of a pytree (model, optimizer state) to every device."""
+    arrays, static = eqx.partition(tree, eqx.is_array)
+    return eqx.combine(jax.device_put(arrays, replicated(mesh)), static)
+
+
+def data_parallel_step(
+    compute_loss: Callable[..., Tuple[jax.Array, Any]],
+    optimizer: Any,
+    mesh: Mesh,
+    axis_name: str = DATA_AXIS,
+) -> Callable[..., Tuple[jax.Array, Any, Any]]:
+    """
+    Build a jitted training step that runs on every device of the mesh.
+
+    Args:
+        compute_loss: Function (model, x, y) -> (loss, grads), e.g. wrapped
+            in eqx.filter_value_and_grad; loss must be a mean over the batch
+        optimizer: Optax gradient transformation
+        mesh: Device mesh from make_mesh()
+        axis_name: Mesh axis the batch is split along
+
+    Returns:
+        Function (model, opt_state, x, y) -> (loss, model, opt_state), taking
+        replicated model and optimizer state and batches sharded along their
+        first axis (see shard_batch() and replicate())
+    """
+    batch = PartitionSpec(axis_name)
+
+    @eqx.filter_jit
+    def make_step(model, opt_state, x, y):
+        params, static = eqx.partition(model, eqx.is_array)
+
+        def local_step(params, x, y):
+            loss, grads = compute_loss(eqx.combine(params, static), x, y)
+            # All-reduce: mean over devices of the per-device batch means
+            return jax.lax.pmean((loss, grads), axis_name)
+
+        loss, grads = shard_map(
+            local_step,
+            mesh=mesh,
+            in_specs=(PartitionSpec(), batch, batch),
+            out_specs=PartitionSpec(),
+        )(params, x, y)
+        updates, opt_state = optimizer.update(grads, opt_state, model)
+        model = eqx.apply_updates(model, updates)
+        return loss, model, opt_state
+
+    return make_step
@@ -0,0 +1,407 @@
+"""
+Composable streaming preprocessing pipeline.
+
+A Pipeline chains Stage objects over batches of texts. Every stage is a
+generator over the batch stream, so memory stays bounded by the batch size,
+and every stage records how many texts it received and kept and how long it
+spent on them. That makes it easy to see where time goes and to put cheap
+filters in front of expensive ones.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .dedup.exact import ExactDedup
+from .dedup.minhash import NearDedup
+from .preprocessing.cleaner import BalochiTextCleaner
+from .preprocessing.normalizer import BalochiTextNormalizer
+from .preprocessing.stopwords import BalochiStopwordRemover
+
+
+class StageStats:
+    """Counters collected for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.max_batch_seconds = 0.0
+
+    @property
+    def dropped(self) -> int:
+        """Number of texts the stage removed."""
+        return self.items_in - self.items_out
+
+    @property
+    def throughput(self) -> float:
+        """Input texts processed per second of stage time."""
+        return self.items_in / self.seconds if self.seconds else 0.0
+
+    @property
+    def mean_batch_seconds(self) -> float:
+        """Average time spent on one batch."""
+        return self.seconds / self.batches if self.batches else 0.0
+
+    def record(self, items_in: int, items_out: int, seconds: float) -> None:
+        """Add the measurements of one processed batch."""
+        self.items_in += items_in
+        self.items_out += items_out
+        self.batches += 1
+        self.seconds += seconds
+        self.max_batch_seconds = max(self.max_batch_seconds, seconds)
+
+    def merge(self, other: "StageStats") -> None:
+        """Add the counters of another StageStats for the same stage."""
+        self.items_in += other.items_in
+        self.items_out += other.items_out
+        self.batches += other.batches
+        self.seconds += other.seconds
+        self.max_batch_seconds = max(self.max_batch_seconds, other.max_batch_seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "seconds": self.seconds,
+            "throughput": self.throughput,
+            "mean_batch_seconds": self.mean_batch_seconds,
+            "max_batch_seconds": self.max_batch_seconds,
+        }
+
+
+class Stage:
+    """
+    One pipeline step: takes a batch of texts and returns the texts it keeps.
+
+    Subclasses implement process(). Stages whose output depends only on the
+    batch itself (not on earlier batches) set stateless = True.
+    """
+
+    name = "stage"
+    stateless = False
+
+    def process(self, batch: List[str]) -> List[str]:
+        raise NotImplementedError
+
+    def stream(
+        self, batches: Iterable[List[str]], stats: StageStats
+    ) -> Iterator[List[str]]:
+        """Apply process() to a stream of batches, recording stats."""
+        for batch in batches:
+            start = time.perf_counter()
+            out = self.process(batch)
+            stats.record(len(batch), len(out), time.perf_counter() - start)
+            yield out
+
+
+class CleanStage(Stage):
+    """Clean texts with a compiled BalochiTextCleaner engine; drops empty results."""
+
+    name = "clean"
+    stateless = True
+
+    def __init__(self, cleaner: Optional[BalochiTextCleaner] = None, **flags):
+        self.cleaner = cleaner or BalochiTextCleaner()
+        self.engine = self.cleaner.compile(**flags)
+
+    def process(self, batch: List[str]) -> List[str]:
+        clean = self.engine.clean
+        return [text for text in map(clean, batch) if text]
+
+
+class NormalizeStage(Stage):
+    """Normalize texts with BalochiTextNormalizer."""
+
+    name = "normalize"
+    stateless = True
+
+    def __init__(
+        self,
+        normalizer: Optional[BalochiTextNormalizer] = None,
+        remove_diacritics: bool = False,
+    ):
+        self.normalizer = normalizer or BalochiTextNormalizer()
+        self.remove_diacritics = remove_diacritics
+
+    def process(self, batch: List[str]) -> List[str]:
+        normalize = self.normalizer.normalize_text
+        return [normalize(text, self.remove_diacritics) for text in batch]
+
+
+class ExactDedupStage(Stage):
+    """Drop texts already seen by an ExactDedup (across batches)."""
+
+    name = "exact_dedup"
+
+    def __init__(self, dedup: Optional[ExactDedup] = None):
+        self.dedup = dedup or ExactDedup()
+
+    def process(self, batch: List[str]) -> List[str]:
+        return list(self.dedup.iter_unique(batch))
+
+
+class NearDedupStage(Stage):
+    """Drop near duplicates of earlier texts with NearDedup.process_single()."""
+
+    name = "near_dedup"
+
+    def __init__(self, dedup: Optional[NearDedup] = None):
+        self.dedup = dedup or NearDedup(threshold=0.85, method="minhash")
+
+    def process(self, batch: List[str]) -> List[str]:
+        return self.dedup.process_batch(batch)
+
+
+class StopwordStage(Stage):
+    """Remove stopwords from every text; drops texts that become empty."""
+
+    name = "stopwords"
+    stateless = True
+
+    def __init__(self, remover: Optional[BalochiStopwordRemover] = None):
+        self.remover = remover or BalochiStopwordRemover()
+
+    def process(self, batch: List[str]) -> List[str]:
+        return [text for text in self.remover.iter_remove(batch) if text]
+
+
+class MinWordsStage(Stage):
+    """Drop texts with fewer than min_words whitespace-separated words."""
+
+    name = "min_words"
+    stateless = True
+
+    def __init__(self, min_words: int = 2):
+        self.min_words = min_words
+
+    def process(self, batch: List[str]) -> List[str]:
+        min_words = self.min_words
+        return [text for text in batch if len(text.split()) >= min_words]
+
+
+class FilterStage(Stage):
+    """Keep texts for which a predicate returns True."""
+
+    stateless = True
+
+    def __init__(self, predicate: Callable[[str], bool], name: str = "filter"):
+        self.predicate = predicate
+        self.name = name
+
+    def process(self, batch: List[str]) -> List[str]:
+        return [text for text in batch if self.predicate(text)]
+
+
+class Pipeline:
+    """Run a sequence of stages over a stream of texts in batches."""
+
+    def __init__(self, stages: Sequence[Stage], batch_size: int = 1000):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in execution order; names must be unique
+            batch_size: Texts handed from stage to stage at once
+        """
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique, got {names}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        self.stages = list(stages)
+        self.batch_size = batch_size
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Clear all stage counters."""
+        self.stats: Dict[str, StageStats] = {
+            stage.name: StageStats(stage.name) for stage in self.stages
+        }
+        self.seconds = 0.0
+
+    def stats_state(self) -> Dict[str, object]:
+        """JSON-serializable snapshot of all counters, see load_stats()."""
+        return {
+            "seconds": self.seconds,
+            "stages": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
+
+    def load_stats(self, state: Dict) -> None:
+        """Restore counters saved by stats_state(), e.g. when resuming a run."""
+        self.reset_stats()
+        self.seconds = state["seconds"]
+        for name, values in state["stages"].items():
+            stats = self.stats[name]
+            stats.items_in = values["items_in"]
+            stats.items_out = values["items_out"]
+            stats.batches = values["batches"]
+            stats.seconds = values["seconds"]
+            stats.max_batch_seconds = values["max_batch_seconds"]
+
+    def parallel_prefix(self) -> int:
+        """Number of leading stateless stages that can run in worker processes."""
+        count = 0
+        for stage in self.stages:
+            if not stage.stateless:
+                break
+            count += 1
+        return count
+
+    def parallel_suffix(self) -> int:
+        """Number of trailing stateless stages after the last stateful one."""
+        if self.parallel_prefix() == len(self.stages):
+            return 0
+        count = 0
+        for stage in reversed(self.stages):
+            if not stage.stateless:
+                break
+            count += 1
+        return count
+
+    def run_batches(
+        self,
+        batches: Iterable[List[str]],
+        num_workers: Optional[int] = 1,
+        parallel_suffix: bool = True,
+    ) -> Iterator[List[str]]:
+        """
+        Push batches through every stage.
+
+        Yields exactly one (possibly empty) output batch per input batch, in
+        order, so callers can associate outputs with input positions.
+
+        Args:
+            batches: Stream of input batches
+            num_workers: With more than one worker (None: one per CPU), the
+                stateless stages before and after the stateful ones (e.g.
+                dedup) run on a process pool, while the stateful stages run
+                here on the ordered results, so the output is identical to a
+                single-process run.
+            parallel_suffix: Also run the stateless stages after the
+                stateful ones on the pool. The stateful stages then get up
+                to 2 * num_workers batches ahead of the yielded output; pass
+                False to keep their state in step with it, e.g. to snapshot
+                dedup state between batches.
+        """
+        prefix = suffix = 0
+        if num_workers != 1:
+            prefix = self.parallel_prefix()
+            suffix = self.parallel_suffix() if parallel_suffix else 0
+        end = len(self.stages) - suffix
+        # Worker processes hold the prefix stages followed by the suffix ones.
+        worker_stages = self.stages[:prefix] + self.stages[end:]
+
+        with ExitStack() as stack:
+            stream: Iterable[List[str]] = batches
+            if worker_stages:
+                pool = stack.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=num_workers,
+                        initializer=_init_pipeline_worker,
+                        initargs=(worker_stages,),
+                    )
+                )
+            if prefix:
+                stream = self._stream_parallel(
+                    stream, pool, worker_stages, 0, prefix, num_workers
+                )
+            for stage in self.stages[prefix:end]:
+                stream = stage.stream(stream, self.stats[stage.name])
+            if suffix:
+                stream = self._stream_parallel(
+                    stream, pool, worker_stages, prefix, prefix + suffix, num_workers
+                )
+
+            # Accumulated per batch so that seconds is current while running.
+            last = time.perf_counter()
+            try:
+                for batch in stream:
+                    now = time.perf_counter()
+                    self.seconds += now - last
+                    last = now
+                    yield batch
+            finally:
+                self.seconds += time.perf_counter() - last
+
+    def _stream_parallel(
+        self,
+        batches: Iterable[List[str]],
+        pool: Executor,
+        worker_stages: List[Stage],
+        start: int,
+        stop: int,
+        num_workers: Optional[int],
+    ) -> Iterator[List[str]]:
+        """Run worker_stages[start:stop] on the pool, yielding results in order."""
+        stages = worker_stages[start:stop]
+        max_pending = 2 * (num_workers or os.cpu_count() or 1)
+        pending: deque = deque()
+
+        def collect() -> List[str]:
+            out, measurements = pending.popleft().result()
+            for stage, (items_in, items_out, seconds) in zip(stages, measurements):
+                self.stats[stage.name].record(items_in, items_out, seconds)
+            return out
+
+        for batch in batches:
+            pending.append(pool.submit(_run_worker_stages, batch, start, stop))
+            if len(pending) >= max_pending:
+                yield collect()
+        while pending:
+            yield collect()
+
+    def run(
+        self, texts: Iterable[str], num_workers: Optional[int] = 1
+    ) -> Iterator[str]:
+        """Stream texts through the pipeline, yielding the surviving texts."""
+        texts = iter(texts)
+        batches = iter(lambda: list(islice(texts, self.batch_size)), [])
+        for batch in self.run_batches(batches, num_workers):
+            yield from batch
+
+    def report(self) -> str:
+        """Format the per-stage counters as a table."""
+        lines = [
+            f"{'stage':<14}{'in':>12}{'out':>12}{'dropped':>12}"
+            f"{'seconds':>10}{'texts/s':>12}{'ms/batch':>10}"
+        ]
+        for stats in self.stats.values():
+            lines.append(
+                f"{stats.name:<14}{stats.items_in:>12,}{stats.items_out:>12,}"
+                f"{stats.dropped:>12,}{stats.seconds:>10.2f}"
+                f"{stats.throughput:>12,.0f}{1000 * stats.mean_batch_seconds:>10.1f}"
+            )
+        lines.append(f"total wall time: {self.seconds:.2f}s")
+        return "\n".join(lines)
+
+
+# Stateless stages copied into each worker process by run_batches().
+_worker_stages: List[Stage] = []
+
+
+def _init_pipeline_worker(stages: List[Stage]) -> None:
+    global _worker_stages
+    _worker_stages = stages
+
+
+def _run_worker_stages(
+    batch: List[str], start: int, stop: int
+) -> Tuple[List[str], List[Tuple[int, int, float]]]:
+    """Apply the worker's stages start..stop-1 to one batch, with timings."""
+    measurements = []
+    for stage in _worker_stages[start:stop]:
+        t0 = time.perf_counter()
+        out = stage.process(batch)
+        measurements.append((len(batch), len(out), time.perf_counter() - t0))
+        batch = out
+    return batch, measurements
@@ -1,11 +1,37 @@
-# from balnlp.preprocessing.stopwords import BALOCHI_STOPWORDS, BalochiStopwordRemover
-# from balnlp.preprocessing.text_clearner import BalochiTextCleaner
-# from balnlp.preprocessing.text_normalizer import BalochiTextNormalizer
-#
-# __all__ = [
-#     "BalochiTextCleaner",
-#     "BalochiTextNormalizer",
-#     "BalochiStopwordRemover",
-#     "BALOCHI_STOPWORDS",
-# ]
-#
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "BalochiTextCleaner": ".cleaner",
+    "BalochiTextNormalizer": ".normalizer",
+    "BalochiStopwordRemover": ".stopwords",
+    "BALOCHI_STOPWORDS": ".stopwords",
+    "StopwordMatcher": ".stopwords",
+    "TermStats": ".term_stats",
+    "CountMinSketch": ".term_stats",
+    "HeavyHitters": ".term_stats",
+}
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+__all__ = [
+    "BalochiTextCleaner",
+    "BalochiTextNormalizer",
+    "BalochiStopwordRemover",
+    "BALOCHI_STOPWORDS",
+    "StopwordMatcher",
+    "TermStats",
+    "CountMinSketch",
+    "HeavyHitters",
+]
+
+if TYPE_CHECKING:
+    from .cleaner import BalochiTextCleaner
+    from .normalizer import BalochiTextNormalizer
+    from .stopwords import (
+        BALOCHI_STOPWORDS,
+        BalochiStopwordRemover,
+        StopwordMatcher,
+    )
+    from .term_stats import CountMinSketch, HeavyHitters, TermStats
@@ -1,6 +1,6 @@
 # src/preprocessing/cleaner.py
 import re
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 
 class BalochiTextCleaner:
@@ -20,6 +20,7 @@ class BalochiTextCleaner:
         self.devanagari_pattern = r"[\u0900-\u097F]+"
         self.extra_spaces = r"\s+"
         self.special_marks = ["ءُ", "ءَ", "ءِ"]
+        self._engines: Dict[Tuple, "CleaningEngine"] = {}
 
     def remove_urls(self, text):
         return re.sub(self.url_pattern, " ", text)
@@ -92,3 +93,168 @@ class BalochiTextCleaner:
         if preserve_special_chars:
             text = self.process_special_chars(text)
         return text
+
+    def compile(
+        self,
+        remove_urls: bool = True,
+        remove_emails: bool = True,
+        remove_numbers: bool = True,
+        remove_emojis: bool = True,
+        preserve_special_chars: bool = True,
+        keep_chars: Optional[List[str]] = None,
+    ) -> "CleaningEngine":
+        """
+        Build (or reuse) a compiled engine for one set of clean_text() flags.
+
+        Args:
+            remove_urls: Same as clean_text()
+            remove_emails: Same as clean_text()
+            remove_numbers: Same as clean_text()
+            remove_emojis: Same as clean_text()
+            preserve_special_chars: Same as clean_text()
+            keep_chars: Same as clean_text()
+
+        Returns:
+            CleaningEngine producing the same output as clean_text()
+        """
+        key = (
+            remove_urls,
+            remove_emails,
+            remove_numbers,
+            remove_emojis,
+            preserve_special_chars,
+            tuple(keep_chars) if keep_chars else None,
+        )
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = CleaningEngine(self, *key)
+            self._engines[key] = engine
+        return engine
+
+    def clean_batch(self, texts: Iterable[str], **flags) -> Iterator[str]:
+        """Clean an iterable of texts lazily with one compiled engine."""
+        return self.compile(**flags).clean_batch(texts)
+
+    def clean_file(
+        self, file_path: str, encoding: str = "utf-8", **flags
+    ) -> Iterator[str]:
+        """Clean a text file line by line with one compiled engine."""
+        return self.compile(**flags).clean_file(file_path, encoding=encoding)
+
+
+class _SeparatorTable(dict):
+    """
+    str.translate() table mapping separator characters to a space.
+
+    Entries are filled on first sight of each character by testing it against
+    the combined separator pattern, so the table only grows with the alphabet
+    actually present in the corpus.
+    """
+
+    def __init__(self, pattern: "re.Pattern[str]"):
+        super().__init__()
+        self._pattern = pattern
+
+    def __missing__(self, codepoint: int) -> Union[int, str]:
+        value = " " if self._pattern.fullmatch(chr(codepoint)) else codepoint
+        self[codepoint] = value
+        return value
+
+
+class CleaningEngine:
+    """
+    Precompiled cleaning plan for one combination of clean_text() flags.
+
+    clean_text() runs up to ten regex substitutions per call. Every
+    substitution after URL and email removal replaces single characters (or
+    runs of them) with a space and whitespace is collapsed afterwards, so they
+    are folded into one translation table here. Tokens containing hamza are
+    split once and memoized.
+    """
+
+    _TOKEN_CACHE_SIZE = 100_000
+
+    def __init__(
+        self,
+        cleaner: BalochiTextCleaner,
+        remove_urls: bool = True,
+        remove_emails: bool = True,
+        remove_numbers: bool = True,
+        remove_emojis: bool = True,
+        preserve_special_chars: bool = True,
+        keep_chars: Optional[Tuple[str, ...]] = None,
+    ):
+        self.preserve_special_chars = preserve_special_chars
+        self.special_marks = tuple(cleaner.special_marks)
+
+        # Substring removals run in clean_text() order, before anything else.
+        self._removals = []
+        if remove_urls:
+            self._removals.append(re.compile(cleaner.url_pattern))
+        if remove_emails:
+            self._removals.append(re.compile(cleaner.email_pattern))
+
+        if preserve_special_chars:
+            allowed = "".join(keep_chars) if keep_chars else "ءُءَءِ"
+            disallowed = rf"[^\w\s{re.escape(allowed)}]"
+        else:
+            disallowed = r"[^\w\s]"
+        separators = [
+            disallowed,
+            cleaner.latin_pattern,
+            cleaner.chinese_pattern,
+            cleaner.devanagari_pattern,
+        ]
+        if remove_emojis:
+            separators.append(cleaner.emoji_pattern)
+        if remove_numbers:
+            separators.append(cleaner.number_pattern)
+        self._separators = _SeparatorTable(
+            re.compile("(?:" + "|".join(separators) + ")+")
+        )
+        self._token_cache: Dict[str, str] = {}
+
+    def _split_token(self, token: str) -> str:
+        """Split one hamza-bearing token exactly like process_special_chars()."""
+        for mark in self.special_marks:
+            if mark in token:
+                return " ".join([p for p in token.split(mark) if p] + [mark])
+        return " ".join(token.replace("ء", " ء ").split())
+
+    def _process_special_chars(self, text: str) -> str:
+        if "ء" not in text:
+            return text
+        cache = self._token_cache
+        if len(cache) > self._TOKEN_CACHE_SIZE:
+            cache.clear()
+        out = []
+        for token in text.split(" "):
+            if "ء" in token:
+                split = cache.get(token)
+                if split is None:
+                    split = cache[token] = self._split_token(token)
+                out.append(split)
+            else:
+                out.append(token)
+        return " ".join(out)
+
+    def clean(self, text: str) -> str:
+        """Clean one text, identical to BalochiTextCleaner.clean_text()."""
+        text = text.strip()
+        for pattern in self._removals:
+            text = pattern.sub(" ", text)
+        text = " ".join(text.translate(self._separators).split())
+        if self.preserve_special_chars:
+            text = self._process_special_chars(text)
+        return text
+
+    def clean_batch(self, texts: Iterable[str]) -> Iterator[str]:
+        """Clean texts lazily, yielding one result per input."""
+        clean = self.clean
+        for text in texts:
+            yield clean(text)
+
+    def clean_file(self, file_path: str, encoding: str = "utf-8") -> Iterator[str]:
+        """Stream a file, yielding the cleaned form of every line."""
+        with open(file_path, "r", encoding=encoding) as f:
+            yield from self.clean_batch(f)
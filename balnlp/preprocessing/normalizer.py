@@ -1,5 +1,8 @@
+import os
 import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 
 class BalochiTextNormalizer:
@@ -43,34 +46,130 @@ class BalochiTextNormalizer:
         ]
         # Common Arabic/Balochi punctuation
         self.punctuations = "؟،؛.!؟…“”\"'()[]{}:"
+        self.compile()
 
-    def normalize_chars(self, text: str) -> str:
-        for original, normalized in self.char_maps.items():
-            text = text.replace(original, normalized)
+    def compile(self) -> None:
+        """
+        Precompute replacement tables and punctuation patterns.
+
+        No mapping output is itself remapped, so applying the non-identity
+        mappings in any order equals the sequential replacements. Call again
+        after editing char_maps, diacritics or punctuations.
+        """
+        # str.translate() does a Python-level lookup per non-ASCII character,
+        # which is several times slower here than a few membership-gated
+        # str.replace() calls over the handful of characters that change.
+        self._char_replacements = tuple(
+            (original, normalized)
+            for original, normalized in self.char_maps.items()
+            if original != normalized
+        )
+        self._diacritic_replacements = tuple((d, "") for d in self.diacritics)
+
+        # normalize_spaces() collapses whitespace first, so a single space is
+        # the only whitespace left around punctuation.
+        punct = re.escape(self.punctuations)
+        self._space_before_punct = re.compile(rf" (?=[{punct}])")
+        self._space_after_punct = re.compile(rf"(?<=[{punct}])(?=\S)")
+
+    @staticmethod
+    def _replace_all(text: str, replacements: Tuple[Tuple[str, str], ...]) -> str:
+        for original, normalized in replacements:
+            if original in text:
+                text = text.replace(original, normalized)
         return text
 
+    def normalize_chars(self, text: str) -> str:
+        return self._replace_all(text, self._char_replacements)
+
     def remove_diacritics(self, text: str) -> str:
-        for d in self.diacritics:
-            text = text.replace(d, "")
-        return text
+        return self._replace_all(text, self._diacritic_replacements)
 
     def normalize_spaces(self, text: str) -> str:
         # Remove multiple spaces
         text = " ".join(text.split())
         # Remove spaces before punctuation
-        text = re.sub(rf"\s+([{re.escape(self.punctuations)}])", r"\1", text)
+        text = self._space_before_punct.sub("", text)
         # Ensure a single space after punctuation if not end of line
-        text = re.sub(rf"([{re.escape(self.punctuations)}])(?=\S)", r"\1 ", text)
+        text = self._space_after_punct.sub(" ", text)
         return text.strip()
 
     def normalize_text(self, text: str, remove_diacritics: bool = False) -> str:
         text = self.normalize_chars(text)
         if remove_diacritics:
             text = self.remove_diacritics(text)
-        text = self.normalize_spaces(text)
-        return text
+        return self.normalize_spaces(text)
+
+    def normalize(self, text: str, remove_diacritics: bool = False) -> str:
+        """Alias of normalize_text()."""
+        return self.normalize_text(text, remove_diacritics)
+
+    def iter_normalize_corpus(
+        self,
+        corpus: Iterable[str],
+        remove_diacritics: bool = False,
+        num_workers: Optional[int] = 1,
+        chunk_size: int = 10_000,
+    ) -> Iterator[str]:
+        """
+        Stream normalized texts, optionally fanning out over a process pool.
+
+        Args:
+            corpus: iterable of texts, consumed lazily
+            remove_diacritics: Same as normalize_text()
+            num_workers: Worker processes; 1 normalizes in this process,
+                None uses one per CPU
+            chunk_size: Texts sent to a worker per task
+
+        Yields:
+            normalized texts in input order
+        """
+        if num_workers == 1:
+            for text in corpus:
+                yield self.normalize_text(text, remove_diacritics)
+            return
+
+        corpus = iter(corpus)
+        chunks = iter(lambda: list(islice(corpus, chunk_size)), [])
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_normalizer_worker,
+            initargs=(self, remove_diacritics),
+        ) as pool:
+            # Keep a bounded number of chunks in flight to stay streaming.
+            pending = []
+            max_pending = 2 * (num_workers or os.cpu_count() or 1)
+            for chunk in chunks:
+                pending.append(pool.submit(_normalize_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
 
     def normalize_corpus(
-        self, corpus: List[str], remove_diacritics: bool = False
+        self,
+        corpus: List[str],
+        remove_diacritics: bool = False,
+        num_workers: Optional[int] = 1,
     ) -> List[str]:
-        return [self.normalize_text(text, remove_diacritics) for text in corpus]
+        return list(self.iter_normalize_corpus(corpus, remove_diacritics, num_workers))
+
+
+# Per-process state used by iter_normalize_corpus() workers.
+_worker_normalizer: Optional[BalochiTextNormalizer] = None
+_worker_remove_diacritics = False
+
+
+def _init_normalizer_worker(
+    normalizer: BalochiTextNormalizer, remove_diacritics: bool
+) -> None:
+    global _worker_normalizer, _worker_remove_diacritics
+    _worker_normalizer = normalizer
+    _worker_remove_diacritics = remove_diacritics
+
+
+def _normalize_chunk(texts: List[str]) -> List[str]:
+    return [
+        _worker_normalizer.normalize_text(t, _worker_remove_diacritics)  # type: ignore
+        for t in texts
+    ]
@@ -8,7 +8,17 @@ custom stopwords.
 
 import os
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 
 def load_stopwords(filepath: str) -> Set[str]:
@@ -44,13 +54,198 @@ def load_stopwords(filepath: str) -> Set[str]:
 # Default stopwords path
 _RESOURCES_DIR = Path(__file__).parent.parent / "resources"
 _DEFAULT_STOPWORDS_PATH = _RESOURCES_DIR / "bal_stopwords" / "balochiStopwords.txt"
-print(_RESOURCES_DIR)
 
-# Load default stopwords
-try:
-    BALOCHI_STOPWORDS: Set[str] = load_stopwords(str(_DEFAULT_STOPWORDS_PATH))
-except FileNotFoundError:
-    BALOCHI_STOPWORDS = set()
+# Loaded on first use by default_stopwords()
+_default_stopwords: Optional[Set[str]] = None
+
+
+def default_stopwords() -> Set[str]:
+    """
+    Return the bundled stopword set, reading the file on the first call only.
+
+    The same set object is returned every time (and as BALOCHI_STOPWORDS), so
+    additions to it apply to every remover created afterwards.
+    """
+    global _default_stopwords
+    if _default_stopwords is None:
+        try:
+            _default_stopwords = load_stopwords(str(_DEFAULT_STOPWORDS_PATH))
+        except FileNotFoundError:
+            _default_stopwords = set()
+    return _default_stopwords
+
+
+def __getattr__(name: str):
+    # BALOCHI_STOPWORDS is resolved lazily so importing this module reads nothing.
+    if name == "BALOCHI_STOPWORDS":
+        return default_stopwords()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _TrackedSet(set):
+    """Set that counts in-place changes, so compiled lookups can detect them."""
+
+    version = 0
+
+
+def _tracked(method_name: str):
+    method = getattr(set, method_name)
+
+    def mutate(self, *args):
+        self.version += 1
+        return method(self, *args)
+
+    mutate.__name__ = method_name
+    return mutate
+
+
+for _name in (
+    "add",
+    "clear",
+    "difference_update",
+    "discard",
+    "intersection_update",
+    "pop",
+    "remove",
+    "symmetric_difference_update",
+    "update",
+    "__iand__",
+    "__ior__",
+    "__isub__",
+    "__ixor__",
+):
+    setattr(_TrackedSet, _name, _tracked(_name))
+del _name
+
+
+class StopwordMatcher:
+    """
+    Compiled stopword lookup for whole documents and token lists.
+
+    Single-word stopwords go into a frozenset; entries made of several
+    whitespace-separated tokens (e.g. clitic sequences) go into a token trie
+    and are matched against consecutive tokens, longest match first. The
+    trie is only walked for documents containing the first two tokens of
+    some entry, a check done at C speed with a set of token pairs.
+    """
+
+    # Trie key marking the end of an entry (tokens are never empty).
+    _END = ""
+
+    def __init__(self, stopwords: Iterable[str]):
+        """
+        Compile a set of stopwords.
+
+        Args:
+            stopwords: Stopwords; entries containing whitespace are phrases
+        """
+        single: Set[str] = set()
+        phrases: Set[Tuple[str, ...]] = set()
+        for entry in stopwords:
+            tokens = tuple(entry.split())
+            if len(tokens) == 1:
+                single.add(tokens[0])
+            elif tokens:
+                phrases.add(tokens)
+
+        self.single: FrozenSet[str] = frozenset(single)
+        self.phrases: FrozenSet[Tuple[str, ...]] = frozenset(phrases)
+        self._trie: Dict = {}
+        for phrase in self.phrases:
+            node = self._trie
+            for token in phrase:
+                node = node.setdefault(token, {})
+            node[self._END] = True
+        self._starts = frozenset(self._trie)
+        self._first_pairs = frozenset(phrase[:2] for phrase in self.phrases)
+
+    def _has_phrase_start(self, tokens: Sequence[str]) -> bool:
+        """Whether any multi-word entry could match somewhere in tokens."""
+        pairs = self._first_pairs
+        return bool(pairs) and not pairs.isdisjoint(zip(tokens, tokens[1:]))
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.single or tuple(word.split()) in self.phrases
+
+    def _match_length(self, tokens: Sequence[str], start: int) -> int:
+        """Length of the longest phrase starting at tokens[start], or 0."""
+        end = self._END
+        node = self._trie[tokens[start]]
+        longest = 0
+        for i in range(start + 1, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if end in node:
+                longest = i - start + 1
+        return longest
+
+    def filter_tokens(self, tokens: Sequence[str]) -> List[str]:
+        """
+        Drop stopwords and stopword phrases from a token sequence.
+
+        Args:
+            tokens: Tokens, e.g. text.split() or a word tokenizer's output
+
+        Returns:
+            The remaining tokens in order
+        """
+        single = self.single
+        if not self._has_phrase_start(tokens):
+            return [token for token in tokens if token not in single]
+        return self._filter_with_phrases(tokens)
+
+    def _filter_with_phrases(self, tokens: Sequence[str]) -> List[str]:
+        """filter_tokens() for token lists that may contain a phrase."""
+        single = self.single
+        first_pairs = self._first_pairs
+        candidates = [
+            i for i, pair in enumerate(zip(tokens, tokens[1:])) if pair in first_pairs
+        ]
+
+        # Tokens between phrase matches are filtered by comprehension.
+        kept: List[str] = []
+        pos = 0
+        for start in candidates:
+            if start < pos:
+                continue
+            length = self._match_length(tokens, start)
+            if length:
+                kept += [token for token in tokens[pos:start] if token not in single]
+                pos = start + length
+        kept += [token for token in tokens[pos:] if token not in single]
+        return kept
+
+    def remove(self, text: str) -> str:
+        """Remove stopwords from one text, joining the rest with single spaces."""
+        return " ".join(self.filter_tokens(text.split()))
+
+    def remove_batch(self, texts: Iterable[str]) -> List[str]:
+        """Remove stopwords from every text, returning one result per input."""
+        return list(self.iter_remove(texts))
+
+    def iter_remove(self, texts: Iterable[str]) -> Iterator[str]:
+        """Remove stopwords from a stream of texts lazily."""
+        single = self.single
+        if not self.phrases:
+            for text in texts:
+                yield " ".join([token for token in text.split() if token not in single])
+            return
+
+        has_phrase_start = self._has_phrase_start
+        filter_with_phrases = self._filter_with_phrases
+        for text in texts:
+            tokens = text.split()
+            if has_phrase_start(tokens):
+                yield " ".join(filter_with_phrases(tokens))
+            else:
+                yield " ".join([token for token in tokens if token not in single])
+
+    def filter_token_batch(
+        self, token_lists: Iterable[Sequence[str]]
+    ) -> List[List[str]]:
+        """Apply filter_tokens() to pre-tokenized documents."""
+        return [self.filter_tokens(tokens) for tokens in token_lists]
 
 
 class BalochiStopwordRemover:
@@ -69,28 +264,63 @@ class BalochiStopwordRemover:
             stopwords_file (Optional[str]): Path to a custom stopwords file.
                 If provided, these stopwords will be used instead of the default ones.
         """
+        self._matcher: Optional[StopwordMatcher] = None
+        self._matcher_version = -1
         if stopwords_file:
             self.stopwords = load_stopwords(stopwords_file)
         else:
-            self.stopwords = BALOCHI_STOPWORDS.copy()
+            self.stopwords = default_stopwords().copy()
 
         if custom_stopwords:
             self.stopwords.update(custom_stopwords)
 
+    @property
+    def stopwords(self) -> Set[str]:
+        """
+        The stopword set.
+
+        It may be edited in place; the compiled matcher is rebuilt on the
+        next call after any change. Assigning a set stores a copy.
+        """
+        return self._stopwords
+
+    @stopwords.setter
+    def stopwords(self, stopwords: Set[str]) -> None:
+        self._stopwords = _TrackedSet(stopwords)
+        self._matcher = None
+
+    def compile(self) -> StopwordMatcher:
+        """Build (or reuse) the matcher for the current stopword set."""
+        version = self._stopwords.version
+        if self._matcher is None or self._matcher_version != version:
+            self._matcher = StopwordMatcher(self._stopwords)
+            self._matcher_version = version
+        return self._matcher
+
     def is_stopword(self, word: str) -> bool:
         """Check if a word is a stopword."""
         return word.strip() in self.stopwords
 
     def remove_stopwords(self, text: str) -> str:
-        """Remove stopwords from a text string."""
-        words = text.split()
-        filtered_words = [word for word in words if not self.is_stopword(word)]
-        return " ".join(filtered_words)
+        """Remove stopwords (and multi-word stopword phrases) from a text string."""
+        return self.compile().remove(text)
+
+    def remove_batch(self, texts: Iterable[str]) -> List[str]:
+        """Remove stopwords from a list of documents with the compiled matcher."""
+        return self.compile().remove_batch(texts)
+
+    def iter_remove(self, texts: Iterable[str]) -> Iterator[str]:
+        """Remove stopwords from a stream of documents lazily."""
+        return self.compile().iter_remove(texts)
 
     def remove_stopwords_from_list(self, words: List[str]) -> List[str]:
         """Remove stopwords from a list of words."""
         return [w for w in words if not self.is_stopword(w)]
 
+    def remove_stopwords_from_tokens(self, tokens: Sequence[str]) -> List[str]:
+        """Remove stopwords and stopword phrases from pre-tokenized input."""
+        return self.compile().filter_tokens(tokens)
+
     def add_stopwords(self, new_stopwords: Set[str]) -> None:
         """Add new stopwords to the existing set."""
         self.stopwords.update(new_stopwords)
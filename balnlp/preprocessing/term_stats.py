@@ -0,0 +1,433 @@
+"""
+Streaming term statistics for corpora too large for a Counter.
+
+TermStats counts term and document frequencies in a Count-Min sketch, whose
+memory is fixed by its width and depth, and tracks the most frequent terms
+with a mergeable Misra-Gries summary. Both structures can be merged, so
+workers can each count a shard of the corpus and the results are added up.
+The statistics drive stopword proposals for BalochiStopwordRemover.
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+def hash_terms(terms: Iterable[str]) -> np.ndarray:
+    """Hash terms to stable 64-bit values (independent of PYTHONHASHSEED)."""
+    blake2b = hashlib.blake2b
+    return np.frombuffer(
+        b"".join(blake2b(t.encode("utf-8"), digest_size=8).digest() for t in terms),
+        dtype="<u8",
+    )
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch of non-negative item counts.
+
+    Estimates never undercount; with probability 1 - exp(-depth) an estimate
+    exceeds the true count by at most e / width times the total count added
+    (see error_bound). The table takes 8 * width * depth bytes.
+    """
+
+    def __init__(self, width: int = 1 << 20, depth: int = 4):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            width: Counters per row
+            depth: Number of rows (independent hash functions)
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth, dtype=np.uint64)[:, np.newaxis]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes used by the counter table."""
+        return self._table.nbytes
+
+    @property
+    def error_bound(self) -> float:
+        """Overcount that estimates stay below with probability 1 - exp(-depth)."""
+        return math.e / self.width * self.total
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        """Column of every hash in every row, shape (depth, len(hashes))."""
+        # Row i uses h1 + i * h2 (double hashing over the two 32-bit halves).
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        return ((h1 + self._rows * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def add_hashes(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Add counts for pre-hashed items.
+
+        Args:
+            hashes: uint64 item hashes from hash_terms()
+            counts: Non-negative count to add for each hash
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        columns = self._columns(np.asarray(hashes, dtype=np.uint64))
+        for row in range(self.depth):
+            np.add.at(self._table[row], columns[row], counts)
+        self.total += int(counts.sum())
+
+    def update(self, counts: Mapping[str, int]) -> None:
+        """Add a mapping of item -> count, e.g. a Counter of one batch."""
+        if counts:
+            self.add_hashes(hash_terms(counts), np.fromiter(counts.values(), np.int64))
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Estimated counts of pre-hashed items."""
+        columns = self._columns(np.asarray(hashes, dtype=np.uint64))
+        return np.take_along_axis(self._table, columns, axis=1).min(axis=0)
+
+    def estimate(self, items: Iterable[str]) -> np.ndarray:
+        """Estimated counts of several items, as an int64 array."""
+        return self.estimate_hashes(hash_terms(items))
+
+    def __getitem__(self, item: str) -> int:
+        return int(self.estimate([item])[0])
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Add the counts of a sketch with the same shape to this one."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError(
+                f"Cannot merge a {other.depth}x{other.width} sketch into a "
+                f"{self.depth}x{self.width} one"
+            )
+        self._table += other._table
+        self.total += other.total
+        return self
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent items, in bounded memory.
+
+    Every item whose true count exceeds total / (capacity + 1) is kept.
+    Stored counts undercount by at most error, the total subtracted while
+    pruning. Summaries merge by adding counts and pruning again, which keeps
+    the same guarantee for the combined stream.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        """
+        Initialize an empty summary.
+
+        Args:
+            capacity: Number of counters kept after pruning
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.total = 0
+        self.error = 0
+        self.counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.counts
+
+    def update(self, counts: Mapping[str, int]) -> None:
+        """Add a mapping of item -> count, e.g. a Counter of one batch."""
+        self._add(counts)
+        self.total += sum(counts.values())
+
+    def _add(self, counts: Mapping[str, int]) -> None:
+        stored = self.counts
+        for item, count in counts.items():
+            stored[item] = stored.get(item, 0) + count
+        # Pruning is amortized: counters may grow to twice the capacity first.
+        if len(stored) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Subtract the (capacity + 1)-th largest count from every counter."""
+        if len(self.counts) <= self.capacity:
+            return
+        cut = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {
+            item: count - cut for item, count in self.counts.items() if count > cut
+        }
+        self.error += cut
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """Add another summary's counts to this one."""
+        self._add(other.counts)
+        self.total += other.total
+        self.error += other.error
+        return self
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Tracked items with their lower-bound counts, most frequent first.
+
+        Args:
+            n: Number of items to return (default: all tracked items)
+        """
+        self._prune()
+        if n is None:
+            return sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return heapq.nsmallest(n, self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+class TermStats:
+    """
+    Term and document frequencies of a stream of documents.
+
+    A document is one text (one corpus line); its terms come from tokenize
+    (default: str.split). Term frequency (tf) counts every occurrence,
+    document frequency (df) counts the documents containing a term. Memory is
+    bounded by the two sketches (16 * width * depth bytes) and the two
+    heavy-hitter summaries, however large the corpus.
+    """
+
+    def __init__(
+        self,
+        width: int = 1 << 20,
+        depth: int = 4,
+        top_k: int = 10_000,
+        tokenize: Optional[Callable[[str], List[str]]] = None,
+    ):
+        """
+        Initialize empty statistics.
+
+        Args:
+            width: Counters per sketch row
+            depth: Rows per sketch
+            top_k: Number of most frequent terms tracked by tf and by df
+            tokenize: Function splitting a text into terms (must be picklable
+                to use the stats in worker processes)
+        """
+        self.tokenize = tokenize
+        self.num_docs = 0
+        self.tf = CountMinSketch(width, depth)
+        self.df = CountMinSketch(width, depth)
+        self.top_tf = HeavyHitters(top_k)
+        self.top_df = HeavyHitters(top_k)
+
+    @property
+    def num_tokens(self) -> int:
+        """Number of term occurrences counted."""
+        return self.tf.total
+
+    def update(self, texts: Iterable[str], batch_size: int = 10_000) -> None:
+        """
+        Count the terms of a stream of documents.
+
+        Args:
+            texts: Documents to count
+            batch_size: Documents counted exactly in a Counter before they
+                are folded into the sketches
+        """
+        tokenize = self.tokenize or str.split
+        texts = iter(texts)
+        for batch in iter(lambda: list(islice(texts, batch_size)), []):
+            tf: Counter = Counter()
+            df: Counter = Counter()
+            for text in batch:
+                terms = tokenize(text)
+                tf.update(terms)
+                df.update(set(terms))
+            self.num_docs += len(batch)
+            self.tf.update(tf)
+            self.top_tf.update(tf)
+            self.df.update(df)
+            self.top_df.update(df)
+
+    def merge(self, other: "TermStats") -> "TermStats":
+        """Add the counts of statistics gathered elsewhere, e.g. in a worker."""
+        self.tf.merge(other.tf)
+        self.df.merge(other.df)
+        self.top_tf.merge(other.top_tf)
+        self.top_df.merge(other.top_df)
+        self.num_docs += other.num_docs
+        return self
+
+    def term_frequency(self, term: str) -> int:
+        """Estimated number of occurrences of term (never an undercount)."""
+        return self.tf[term]
+
+    def document_frequency(self, term: str) -> int:
+        """Estimated number of documents containing term (never an undercount)."""
+        return self.df[term]
+
+    def top_terms(self, n: int = 100, by: str = "tf") -> List[Tuple[str, int]]:
+        """
+        Most frequent terms with their estimated counts.
+
+        Args:
+            n: Number of terms
+            by: "tf" for term frequency, "df" for document frequency
+
+        Returns:
+            List of (term, count), most frequent first
+        """
+        if by not in ("tf", "df"):
+            raise ValueError(f"Unknown frequency '{by}', use 'tf' or 'df'")
+        sketch, top = (self.tf, self.top_tf) if by == "tf" else (self.df, self.top_df)
+
+        candidates = top.most_common()
+        if not candidates:
+            return []
+        terms = [term for term, _ in candidates]
+        # The true count lies between the summary's lower bound and the sketch.
+        lower = np.array([count for _, count in candidates], dtype=np.int64)
+        counts = np.minimum(sketch.estimate(terms), lower + top.error)
+        ranked = sorted(zip(terms, counts.tolist()), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:n]
+
+    def propose_stopwords(
+        self,
+        min_doc_ratio: float = 0.05,
+        max_stopwords: Optional[int] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Propose terms that occur in a large share of all documents.
+
+        The result can be passed to BalochiStopwordRemover.add_stopwords()
+        after review, or given as exclude the remover's current stopwords
+        to see only new candidates.
+
+        Args:
+            min_doc_ratio: Minimum fraction of documents containing the term
+            max_stopwords: Maximum number of proposals (default: no limit)
+            exclude: Terms never proposed
+
+        Returns:
+            Proposed terms, highest document frequency first
+        """
+        if not self.num_docs:
+            return []
+        exclude = set(exclude)
+        min_docs = min_doc_ratio * self.num_docs
+        proposals = [
+            term
+            for term, docs in self.top_terms(len(self.top_df), by="df")
+            if docs >= min_docs and term not in exclude
+        ]
+        return proposals[:max_stopwords]
+
+    def df_distribution(self, num_bins: int = 10) -> List[Tuple[float, float, int]]:
+        """
+        Histogram of document-frequency ratios over the tracked terms.
+
+        Bins are logarithmic between 1 / num_docs and 1, so each bin holds
+        terms whose document frequency is about the same power of ten.
+        Terms not tracked by the df summary have a document frequency below
+        its error bound and are not counted.
+
+        Args:
+            num_bins: Number of bins
+
+        Returns:
+            List of (low, high, num_terms) with low <= df / num_docs < high
+            (the last bin includes 1.0)
+        """
+        if not self.num_docs:
+            return []
+        ratios = np.array(
+            [docs for _, docs in self.top_terms(len(self.top_df), by="df")],
+            dtype=np.float64,
+        )
+        ratios /= self.num_docs
+        edges = np.logspace(-math.log10(self.num_docs), 0.0, num_bins + 1)
+        hist, _ = np.histogram(np.clip(ratios, edges[0], 1.0), bins=edges)
+        return [
+            (float(lo), float(hi), int(n))
+            for lo, hi, n in zip(edges[:-1], edges[1:], hist)
+        ]
+
+    def report(self, n: int = 20) -> str:
+        """Format the most frequent terms and the df distribution as a table."""
+        lines = [
+            f"documents: {self.num_docs:,}  tokens: {self.num_tokens:,}  "
+            f"(sketch error <= {self.tf.error_bound:,.0f} occurrences)",
+            f"{'term':<20}{'tf':>14}{'df':>14}{'df %':>9}",
+        ]
+        for term, docs in self.top_terms(n, by="df"):
+            share = 100 * docs / self.num_docs
+            lines.append(
+                f"{term:<20}{self.term_frequency(term):>14,}{docs:>14,}{share:>9.2f}"
+            )
+        lines.append(f"{'df ratio':<26}{'terms':>10}")
+        for low, high, count in self.df_distribution():
+            lines.append(f"{f'{low:.1e} - {high:.1e}':<26}{count:>10,}")
+        return "\n".join(lines)
+
+    def save(self, path: str) -> None:
+        """Write the statistics to an .npz file, atomically."""
+        header = {
+            "num_docs": self.num_docs,
+            "tf_total": self.tf.total,
+            "df_total": self.df.total,
+            "top_tf": _summary_state(self.top_tf),
+            "top_df": _summary_state(self.top_df),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.frombuffer(json.dumps(header).encode("utf-8"), np.uint8),
+                tf=self.tf._table,
+                df=self.df._table,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls, path: str, tokenize: Optional[Callable[[str], List[str]]] = None
+    ) -> "TermStats":
+        """Read statistics written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            tf_table, df_table = data["tf"], data["df"]
+
+        depth, width = tf_table.shape
+        stats = cls(width, depth, header["top_tf"]["capacity"], tokenize)
+        stats.num_docs = header["num_docs"]
+        stats.tf._table[:] = tf_table
+        stats.df._table[:] = df_table
+        stats.tf.total = header["tf_total"]
+        stats.df.total = header["df_total"]
+        _load_summary(stats.top_tf, header["top_tf"])
+        _load_summary(stats.top_df, header["top_df"])
+        return stats
+
+
+def _summary_state(top: HeavyHitters) -> Dict[str, object]:
+    top._prune()
+    return {
+        "capacity": top.capacity,
+        "total": top.total,
+        "error": top.error,
+        "counts": top.counts,
+    }
+
+
+def _load_summary(top: HeavyHitters, state: Dict) -> None:
+    top.capacity = state["capacity"]
+    top.total = state["total"]
+    top.error = state["error"]
+    top.counts = dict(state["counts"])
@@ -0,0 +1,343 @@
+"""Background-prefetching batch loader and epoch sampler over a TokenDataset."""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .token_dataset import TokenDataset
+from .utils_file import _Prefetcher
+
+
+def _mix64(z: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer, applied elementwise to a uint64 array."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class FeistelPermutation:
+    """
+    Pseudo-random permutation of range(size) in O(1) memory.
+
+    A balanced Feistel network permutes the smallest power-of-4 domain
+    holding size; values that land outside range(size) are encrypted again
+    until they fall inside (cycle walking), which keeps the map a bijection.
+    Any position can be permuted independently, in vectorized batches.
+    """
+
+    def __init__(self, size: int, seed: Union[int, Sequence[int]], rounds: int = 4):
+        """
+        Args:
+            size: Number of elements
+            seed: Seed (or sequence of seeds) selecting the permutation
+            rounds: Feistel rounds (at least 3 for a pseudo-random permutation)
+        """
+        if size < 1:
+            raise ValueError("size must be positive")
+
+        self.size = size
+        self._half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self._mask = np.uint64((1 << self._half_bits) - 1)
+        self._keys = np.random.SeedSequence(seed).generate_state(rounds, np.uint64)
+
+    def _encrypt(self, x: np.ndarray) -> np.ndarray:
+        half = np.uint64(self._half_bits)
+        left, right = x >> half, x & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix64(right ^ key) & self._mask)
+        return (left << half) | right
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        """Permuted value of every position (each in range(size))."""
+        out = self._encrypt(np.asarray(positions, dtype=np.uint64))
+        outside = out >= np.uint64(self.size)
+        while outside.any():
+            out[outside] = self._encrypt(out[outside])
+            outside = out >= np.uint64(self.size)
+        return out.astype(np.int64)
+
+
+class BlockSampler:
+    """
+    Epoch-based sampler of fixed-length token blocks.
+
+    The dataset is cut into blocks of seq_len + 1 tokens, starting every
+    seq_len tokens (or, with align_to_documents, at every document start,
+    i.e. right after an EOS). Each epoch visits every block once in an order
+    given by a FeistelPermutation seeded with (seed, epoch), so no list of
+    blocks is ever materialized.
+
+    With world_size data-parallel ranks, every global batch of
+    world_size * batch_size consecutive permuted blocks is split into equal
+    contiguous parts; ranks never overlap and all take the same number of
+    steps (the last incomplete global batch of an epoch is dropped).
+    positions(step) is a pure function of the step, so state_dict() is all
+    that is needed to resume.
+    """
+
+    def __init__(
+        self,
+        dataset: TokenDataset,
+        seq_len: int,
+        batch_size: int,
+        seed: int = 0,
+        rank: int = 0,
+        world_size: int = 1,
+        align_to_documents: bool = False,
+        shuffle: bool = True,
+    ):
+        """
+        Initialize the sampler.
+
+        Args:
+            dataset: Token dataset to cut into blocks
+            seq_len: Input tokens per block (blocks hold seq_len + 1 tokens)
+            batch_size: Blocks per batch on this rank
+            seed: Seed of the per-epoch permutations
+            rank: Index of this data-parallel worker
+            world_size: Number of data-parallel workers
+            align_to_documents: Start blocks at document starts instead of
+                every seq_len tokens (a block may continue into the next
+                documents; document tails beyond seq_len are not sampled)
+            shuffle: Visit blocks in permuted order (False: dataset order)
+        """
+        if seq_len < 1 or batch_size < 1:
+            raise ValueError("seq_len and batch_size must be positive")
+        if not 0 <= rank < world_size:
+            raise ValueError(f"rank {rank} is outside world_size {world_size}")
+
+        self.dataset = dataset
+        self.seq_len = seq_len
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rank = rank
+        self.world_size = world_size
+        self.align_to_documents = align_to_documents
+        self.shuffle = shuffle
+        self.step = 0
+
+        width = seq_len + 1
+        counts = []
+        for shard_id, shard in enumerate(dataset.shards):
+            if len(shard) < width:
+                counts.append(0)
+            elif align_to_documents:
+                starts = dataset.document_offsets(shard_id)[:-1]
+                counts.append(int(np.searchsorted(starts, len(shard) - width, "right")))
+            else:
+                counts.append((len(shard) - 1) // seq_len)
+        self._block_bounds = np.cumsum([0] + counts)
+        self.num_blocks = int(self._block_bounds[-1])
+
+        self.steps_per_epoch = self.num_blocks // (batch_size * world_size)
+        if not self.steps_per_epoch:
+            raise ValueError(
+                f"{self.num_blocks} blocks cannot fill one global batch of "
+                f"{batch_size * world_size}"
+            )
+        self._permutation: Optional[FeistelPermutation] = None
+        self._permutation_epoch = -1
+
+    def epoch_of(self, step: int) -> int:
+        """Epoch that a step falls into."""
+        return step // self.steps_per_epoch
+
+    def _permute(self, blocks: np.ndarray, epoch: int) -> np.ndarray:
+        if not self.shuffle:
+            return blocks
+        if self._permutation_epoch != epoch:
+            self._permutation = FeistelPermutation(self.num_blocks, (self.seed, epoch))
+            self._permutation_epoch = epoch
+        return self._permutation(blocks)
+
+    def positions(self, step: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Blocks of this rank's batch at a global step.
+
+        Returns:
+            Tuple of (shard_ids, starts): the shard and the first token of
+            each of the batch_size blocks
+        """
+        epoch, index = divmod(step, self.steps_per_epoch)
+        first = (index * self.world_size + self.rank) * self.batch_size
+        blocks = self._permute(np.arange(first, first + self.batch_size), epoch)
+
+        shard_ids = np.searchsorted(self._block_bounds, blocks, "right") - 1
+        local = blocks - self._block_bounds[shard_ids]
+        if not self.align_to_documents:
+            return shard_ids, local * self.seq_len
+        starts = np.empty_like(local)
+        for shard_id in np.unique(shard_ids):
+            rows = shard_ids == shard_id
+            starts[rows] = self.dataset.document_offsets(shard_id)[local[rows]]
+        return shard_ids, starts
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield positions() of consecutive steps forever, from self.step."""
+        while True:
+            positions = self.positions(self.step)
+            self.step += 1
+            yield positions
+
+    def state_dict(self) -> Dict[str, int]:
+        """Seed, step and epoch, for load_state_dict() on resume."""
+        return {
+            "seed": self.seed,
+            "step": self.step,
+            "epoch": self.epoch_of(self.step),
+            "world_size": self.world_size,
+            "num_blocks": self.num_blocks,
+        }
+
+    def load_state_dict(self, state: Dict[str, int]) -> None:
+        """Continue from a state_dict() taken with the same dataset and world size."""
+        if (state["world_size"], state["num_blocks"]) != (
+            self.world_size,
+            self.num_blocks,
+        ):
+            raise ValueError(
+                "The sampler state was saved for a different dataset or world size"
+            )
+        self.seed = state["seed"]
+        self.step = state["step"]
+
+
+class BatchLoader:
+    """
+    Random (inputs, targets) windows of a token dataset for language modeling.
+
+    Each batch is gathered with one fancy index per shard into a sliding
+    window view of the memory-mapped tokens, on a background thread that
+    keeps up to prefetch batches queued. With a transfer function such as
+    jax.device_put, the next batch is already being copied to the device
+    while the current one is in use.
+
+    Windows start at random positions by default; pass a BlockSampler for
+    epochs with full coverage and data-parallel sharding. Either way batch k
+    depends only on (seed, k), so state_dict() after any number of batches
+    is enough to resume the exact same stream.
+    """
+
+    def __init__(
+        self,
+        dataset: TokenDataset,
+        batch_size: int,
+        seq_len: int,
+        seed: int = 0,
+        step: int = 0,
+        prefetch: int = 2,
+        transfer: Optional[Callable[[np.ndarray], Any]] = None,
+        dtype: np.dtype = np.int32,
+        sampler: Optional[BlockSampler] = None,
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            dataset: Token dataset to sample from
+            batch_size: Windows per batch
+            seq_len: Tokens per input window (targets are shifted by one)
+            seed: Seed of the window positions
+            step: Index of the first batch (see load_state_dict())
+            prefetch: Host batches prepared ahead on the background thread
+            transfer: Function moving an array to the accelerator, e.g.
+                jax.device_put (default: batches stay NumPy arrays)
+            dtype: Dtype of the yielded token arrays
+            sampler: Block sampler choosing the windows (its seed replaces
+                seed; its batch_size and seq_len must match)
+        """
+        if batch_size < 1 or seq_len < 1:
+            raise ValueError("batch_size and seq_len must be positive")
+        if sampler is not None:
+            if (sampler.batch_size, sampler.seq_len) != (batch_size, seq_len):
+                raise ValueError("sampler batch_size and seq_len must match")
+            seed = sampler.seed
+
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.seq_len = seq_len
+        self.seed = seed
+        self.step = step
+        self.prefetch = prefetch
+        self.transfer = transfer
+        self.dtype = np.dtype(dtype)
+        self.sampler = sampler
+
+        # Windows never cross shards; shards too short for one are skipped.
+        width = seq_len + 1
+        self._windows = [
+            sliding_window_view(shard, width) if len(shard) >= width else None
+            for shard in dataset.shards
+        ]
+        counts = [0 if w is None else len(w) for w in self._windows]
+        self._start_bounds = np.cumsum([0] + counts)
+        if not self._start_bounds[-1]:
+            raise ValueError(f"No shard holds a window of {width} tokens")
+
+    def state_dict(self) -> Dict[str, int]:
+        """Position in the batch stream, for load_state_dict() on resume."""
+        if self.sampler is None:
+            return {"seed": self.seed, "step": self.step}
+        self.sampler.step = self.step
+        return self.sampler.state_dict()
+
+    def load_state_dict(self, state: Dict[str, int]) -> None:
+        """Continue from a state_dict(); takes effect at the next iteration."""
+        if self.sampler is not None:
+            self.sampler.load_state_dict(state)
+        self.seed = state["seed"]
+        self.step = state["step"]
+
+    def sample(self, step: int) -> np.ndarray:
+        """
+        Gather the windows of one batch on the host.
+
+        Args:
+            step: Batch index
+
+        Returns:
+            Array of shape (batch_size, seq_len + 1)
+        """
+        if self.sampler is not None:
+            shard_ids, starts = self.sampler.positions(step)
+        else:
+            rng = np.random.default_rng((self.seed, step))
+            picks = rng.integers(0, self._start_bounds[-1], self.batch_size)
+            shard_ids = np.searchsorted(self._start_bounds, picks, "right") - 1
+            starts = picks - self._start_bounds[shard_ids]
+
+        batch = np.empty((self.batch_size, self.seq_len + 1), dtype=self.dtype)
+        for shard_id in np.unique(shard_ids):
+            rows = shard_ids == shard_id
+            batch[rows] = self._windows[shard_id][starts[rows]]
+        return batch
+
+    def _host_batches(self, step: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        while True:
+            batch = self.sample(step)
+            yield np.ascontiguousarray(batch[:, :-1]), np.ascontiguousarray(
+                batch[:, 1:]
+            )
+            step += 1
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        """
+        Yield (inputs, targets) batches forever, starting at self.step.
+
+        self.step counts the batches handed out, so a state_dict() taken
+        after training on a batch resumes with the next one.
+        """
+        transfer = self.transfer or (lambda array: array)
+        host = iter(_Prefetcher(self._host_batches(self.step), self.prefetch))
+        try:
+            x, y = next(host)
+            current = transfer(x), transfer(y)
+            for x, y in host:
+                # Start copying the next batch before handing out this one.
+                upcoming = transfer(x), transfer(y)
+                self.step += 1
+                yield current
+                current = upcoming
+        finally:
+            host.close()
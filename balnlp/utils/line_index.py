@@ -0,0 +1,181 @@
+"""Random access to the lines of large text files through a saved offset index."""
+
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .utils_file import compression_of
+
+_NEWLINE = ord("\n")
+
+
+class LineIndex:
+    """
+    Line-addressable view of a text file.
+
+    The first time a file is opened, its line start offsets are computed in
+    one pass over the memory-mapped file and saved beside it as a uint64
+    array (<path>.idx, 8 bytes per line). Later opens memory-map that array,
+    so line(i) is a single slice of the mapped file and only lines that are
+    actually read are decoded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_path: Optional[str] = None,
+        encoding: str = "utf-8",
+        block_size: int = 64 * 1024 * 1024,
+    ):
+        """
+        Open a file, building its index if it is missing or stale.
+
+        Args:
+            path: Text file, one record per line
+            index_path: Where the offsets are kept (default: path + ".idx")
+            encoding: Encoding used to decode lines
+            block_size: Bytes scanned per step while building the index
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"The file '{path}' does not exist.")
+        if compression_of(path):
+            raise ValueError(
+                f"LineIndex needs random access; decompress {path} or stream "
+                "it with utils_file.open_file()"
+            )
+
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self.encoding = encoding
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+        self._offsets = self._load_offsets(size)
+        if self._offsets is None:
+            self._offsets = self._build_offsets(size, block_size)
+
+    def _load_offsets(self, size: int) -> Optional[np.ndarray]:
+        """Memory-map a saved index, or return None if it is missing or stale."""
+        if not os.path.exists(self.index_path):
+            return None
+        if os.path.getmtime(self.index_path) < os.path.getmtime(self.path):
+            return None
+        offsets = np.load(self.index_path, mmap_mode="r")
+        if offsets.dtype != np.uint64 or not len(offsets) or offsets[-1] != size:
+            return None
+        return offsets
+
+    def _build_offsets(self, size: int, block_size: int) -> np.ndarray:
+        """Scan the file for newlines and save the line start offsets."""
+        parts = [np.zeros(1, dtype=np.uint64)]
+        data = np.frombuffer(self._data, dtype=np.uint8) if size else None
+        for start in range(0, size, block_size):
+            block = data[start : start + block_size]
+            newlines = np.flatnonzero(block == _NEWLINE).astype(np.uint64)
+            parts.append(newlines + np.uint64(start + 1))
+        offsets = np.concatenate(parts)
+        # A last line without a trailing newline still counts as a line.
+        if offsets[-1] != size:
+            offsets = np.append(offsets, np.uint64(size))
+
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, offsets)
+        os.replace(tmp_path, self.index_path)
+        return offsets
+
+    def __enter__(self) -> "LineIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the file mapping."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def byte_range(self, i: int) -> Tuple[int, int]:
+        """Start and end byte offsets of line i, without the line terminator."""
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"line {i} out of range for {n} lines")
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        if end > start and self._data[end - 1] == _NEWLINE:
+            end -= 1
+            if end > start and self._data[end - 1] == ord("\r"):
+                end -= 1
+        return start, end
+
+    def line(self, i: int) -> str:
+        """
+        Decode one line.
+
+        Args:
+            i: Line number (negative numbers count from the end)
+
+        Returns:
+            The line without its trailing newline
+        """
+        start, end = self.byte_range(i)
+        return self._data[start:end].decode(self.encoding)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(key, slice):
+            return [self.line(i) for i in range(*key.indices(len(self)))]
+        return self.line(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_lines()
+
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Lazily decode lines start..stop-1."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield self.line(i)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[str]:
+        """
+        Draw k distinct lines uniformly at random.
+
+        Args:
+            k: Number of lines (at most len(self))
+            seed: Seed for reproducible samples
+
+        Returns:
+            Sampled lines, in sampling order
+        """
+        rng = np.random.default_rng(seed)
+        return [self.line(int(i)) for i in rng.choice(len(self), k, replace=False)]
+
+    def shard_bounds(self, num_shards: int) -> List[Tuple[int, int]]:
+        """Split the lines into num_shards contiguous, equal (start, stop) ranges."""
+        if num_shards < 1:
+            raise ValueError("num_shards must be positive")
+        edges = np.linspace(0, len(self), num_shards + 1).round().astype(int)
+        return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+    def shard(self, shard_id: int, num_shards: int) -> Iterator[str]:
+        """
+        Iterate the lines of one shard, e.g. inside worker shard_id of num_shards.
+
+        Args:
+            shard_id: Shard number, 0 <= shard_id < num_shards
+            num_shards: Total number of shards
+
+        Returns:
+            Iterator over the shard's lines in file order
+        """
+        start, stop = self.shard_bounds(num_shards)[shard_id]
+        return self.iter_lines(start, stop)
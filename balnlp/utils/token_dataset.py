@@ -0,0 +1,346 @@
+"""
+Sharded on-disk token datasets.
+
+A dataset directory holds flat token shards (shard-00000.bin, ...), one
+int64 document offset file per shard (shard-00000.idx) and index.json, which
+records the token dtype, the shard sizes and the totals. TokenDatasetWriter
+appends encoded batches to memory-mapped shards that grow geometrically, so
+memory stays flat however large the corpus is; TokenDataset memory-maps the
+shards for reading.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+INDEX_NAME = "index.json"
+FORMAT = "balnlp-tokens-1"
+_OFFSET_DTYPE = np.dtype("<i8")
+
+
+def token_dtype_for(vocab_size: int) -> np.dtype:
+    """Smallest unsigned dtype that holds the IDs of a vocab_size vocabulary."""
+    if vocab_size <= 1 << 16:
+        return np.dtype("<u2")
+    if vocab_size <= 1 << 32:
+        return np.dtype("<u4")
+    raise ValueError(f"vocab_size {vocab_size} does not fit in 32-bit token IDs")
+
+
+def _shard_name(shard_id: int) -> str:
+    return f"shard-{shard_id:05d}"
+
+
+class TokenDatasetWriter:
+    """
+    Append ragged token batches to a sharded dataset directory.
+
+    Documents never straddle shards: a shard is closed before the document
+    that would take it past shard_tokens (a single longer document gets a
+    shard of its own). index.json is written last by close(), so a
+    directory with an index is always complete; leaving a with block
+    through an exception closes the files without writing it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        vocab_size: int,
+        shard_tokens: int = 1 << 28,
+        initial_tokens: int = 1 << 20,
+        metadata: Optional[Dict] = None,
+    ):
+        """
+        Create (or overwrite) a dataset.
+
+        Args:
+            directory: Output directory
+            vocab_size: Vocabulary size; selects the token dtype and bounds IDs
+            shard_tokens: Maximum tokens per shard
+            initial_tokens: Starting capacity of each shard's memory map,
+                doubled whenever it fills up
+            metadata: Extra JSON-serializable entries for index.json
+        """
+        if shard_tokens < 1 or initial_tokens < 1:
+            raise ValueError("shard_tokens and initial_tokens must be positive")
+
+        self.directory = directory
+        self.vocab_size = vocab_size
+        self.dtype = token_dtype_for(vocab_size)
+        self.shard_tokens = shard_tokens
+        self.initial_tokens = min(initial_tokens, shard_tokens)
+        self.metadata = dict(metadata or {})
+
+        os.makedirs(directory, exist_ok=True)
+        # Files of an earlier dataset in the same directory are replaced.
+        index_path = os.path.join(directory, INDEX_NAME)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        for name in os.listdir(directory):
+            if name.startswith("shard-") and name.endswith((".bin", ".idx")):
+                os.remove(os.path.join(directory, name))
+
+        self.shards: List[Dict[str, int]] = []
+        self._file = None
+        self._offsets_file = None
+        self._map: Optional[np.memmap] = None
+        self._shard_size = 0
+        self._shard_docs = 0
+        self._closed = False
+
+    @property
+    def num_tokens(self) -> int:
+        """Tokens written so far."""
+        return sum(s["num_tokens"] for s in self.shards) + self._shard_size
+
+    @property
+    def num_documents(self) -> int:
+        """Documents written so far."""
+        return sum(s["num_documents"] for s in self.shards) + self._shard_docs
+
+    def __enter__(self) -> "TokenDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open_shard(self) -> None:
+        path = os.path.join(self.directory, _shard_name(len(self.shards)))
+        self._file = open(path + ".bin", "w+b")
+        self._offsets_file = open(path + ".idx", "wb")
+        self._offsets_file.write(np.zeros(1, _OFFSET_DTYPE).tobytes())
+        self._map = None
+        self._shard_size = 0
+        self._shard_docs = 0
+        self._reserve(self.initial_tokens)
+
+    def _reserve(self, num_tokens: int) -> None:
+        """Grow the current shard's file and mapping to hold num_tokens."""
+        capacity = len(self._map) if self._map is not None else 0
+        if num_tokens <= capacity:
+            return
+        capacity = max(num_tokens, 2 * capacity, self.initial_tokens)
+        if self._map is not None:
+            self._map.flush()
+        self._file.truncate(capacity * self.dtype.itemsize)
+        self._map = np.memmap(self._file, dtype=self.dtype, mode="r+")
+
+    def _close_shard(self) -> None:
+        if self._file is None:
+            return
+        self._map.flush()
+        self._map = None
+        # Drop the unused part of the last capacity doubling.
+        self._file.truncate(self._shard_size * self.dtype.itemsize)
+        self._file.close()
+        self._offsets_file.close()
+        self._file = self._offsets_file = None
+        self.shards.append(
+            {
+                "name": _shard_name(len(self.shards)),
+                "num_tokens": self._shard_size,
+                "num_documents": self._shard_docs,
+            }
+        )
+        self._shard_size = 0
+        self._shard_docs = 0
+
+    def write_batch(self, tokens: np.ndarray, offsets: np.ndarray) -> None:
+        """
+        Append documents in ragged layout, as returned by encode_batch().
+
+        Args:
+            tokens: Flat token IDs of all documents
+            offsets: len(documents) + 1 start offsets into tokens
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if len(tokens) and int(tokens.max()) >= self.vocab_size:
+            raise ValueError(
+                f"Token ID {int(tokens.max())} is outside the vocabulary "
+                f"of {self.vocab_size}"
+            )
+        tokens = np.asarray(tokens).astype(self.dtype, copy=False)
+
+        first = 0
+        num_docs = len(offsets) - 1
+        while first < num_docs:
+            if self._file is None:
+                self._open_shard()
+            room = self.shard_tokens - self._shard_size
+            # Whole documents that still fit into the current shard
+            fit = int(np.searchsorted(offsets, offsets[first] + room, "right")) - 1
+            if fit <= first:
+                if self._shard_size:
+                    self._close_shard()
+                    continue
+                fit = first + 1
+            self._append(tokens, offsets, first, fit)
+            first = fit
+            if self._shard_size >= self.shard_tokens:
+                self._close_shard()
+
+    def _append(
+        self, tokens: np.ndarray, offsets: np.ndarray, first: int, last: int
+    ) -> None:
+        """Copy documents first..last-1 into the current shard."""
+        start, stop = int(offsets[first]), int(offsets[last])
+        size = self._shard_size
+        self._reserve(size + stop - start)
+        self._map[size : size + stop - start] = tokens[start:stop]
+        ends = offsets[first + 1 : last + 1] - start + size
+        self._offsets_file.write(ends.astype(_OFFSET_DTYPE).tobytes())
+        self._shard_size += stop - start
+        self._shard_docs += last - first
+
+    def abort(self) -> None:
+        """Close the shard files without writing index.json."""
+        if self._closed:
+            return
+        self._closed = True
+        self._map = None
+        for f in (self._file, self._offsets_file):
+            if f is not None:
+                f.close()
+        self._file = self._offsets_file = None
+
+    def close(self) -> None:
+        """Finish the last shard and write index.json."""
+        if self._closed:
+            return
+        self._close_shard()
+        self._closed = True
+        index = {
+            "format": FORMAT,
+            "dtype": self.dtype.str,
+            "vocab_size": self.vocab_size,
+            "num_tokens": self.num_tokens,
+            "num_documents": self.num_documents,
+            "shards": self.shards,
+            **self.metadata,
+        }
+        path = os.path.join(self.directory, INDEX_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+
+class TokenDataset:
+    """
+    Read-only view of a dataset written by TokenDatasetWriter.
+
+    Shards are memory-mapped, so opening a dataset reads only index.json.
+    Token positions are global: position 0 is the first token of shard 0
+    and the shards follow each other in order.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Open a dataset.
+
+        Args:
+            directory: Directory containing index.json
+        """
+        index_path = os.path.join(directory, INDEX_NAME)
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No token dataset index found at {index_path}")
+        with open(index_path, "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("format") != FORMAT:
+            raise ValueError(f"{index_path} is not a {FORMAT} index")
+
+        self.directory = directory
+        self.dtype = np.dtype(self.index["dtype"])
+        self.vocab_size: int = self.index["vocab_size"]
+        self.num_documents: int = self.index["num_documents"]
+        self.shards = [
+            self._open(s["name"] + ".bin", self.dtype) for s in self.index["shards"]
+        ]
+        self._offsets: List[Optional[np.ndarray]] = [None] * len(self.shards)
+        # Global position of the first token of every shard (plus the end)
+        self.shard_starts = np.zeros(len(self.shards) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in self.shards], out=self.shard_starts[1:])
+        doc_counts = [s["num_documents"] for s in self.index["shards"]]
+        self._doc_starts = np.zeros(len(self.shards) + 1, dtype=np.int64)
+        np.cumsum(doc_counts, out=self._doc_starts[1:])
+
+    def _open(self, name: str, dtype: np.dtype) -> np.ndarray:
+        path = os.path.join(self.directory, name)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def __len__(self) -> int:
+        return int(self.shard_starts[-1])
+
+    @property
+    def num_tokens(self) -> int:
+        """Total number of tokens."""
+        return len(self)
+
+    def read(self, start: int, length: int) -> np.ndarray:
+        """
+        Tokens start..start+length-1 of the global token stream.
+
+        Returns a view into the mapped shard when the range lies in one
+        shard, otherwise a copy joined across shards.
+        """
+        if start < 0 or length < 0 or start + length > len(self):
+            raise IndexError(
+                f"range {start}:{start + length} out of bounds for {len(self)} tokens"
+            )
+        if length == 0:
+            return np.empty(0, dtype=self.dtype)
+        shard = int(np.searchsorted(self.shard_starts, start, "right")) - 1
+        local = start - int(self.shard_starts[shard])
+        if local + length <= len(self.shards[shard]):
+            return self.shards[shard][local : local + length]
+
+        parts = []
+        while length > 0:
+            part = self.shards[shard][local : local + length]
+            parts.append(part)
+            length -= len(part)
+            shard += 1
+            local = 0
+        return np.concatenate(parts)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, np.ndarray]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step < 0:
+                # Read the same tokens in ascending order, then reverse.
+                count = len(range(start, stop, step))
+                if not count:
+                    return np.empty(0, dtype=self.dtype)
+                low = start + (count - 1) * step
+                return self.read(low, start - low + 1)[::step]
+            tokens = self.read(start, max(0, stop - start))
+            return tokens[::step] if step != 1 else tokens
+        if key < 0:
+            key += len(self)
+        return int(self.read(key, 1)[0])
+
+    def document_offsets(self, shard: int) -> np.ndarray:
+        """Start offsets of the documents of one shard (plus the shard end)."""
+        if self._offsets[shard] is None:
+            name = self.index["shards"][shard]["name"] + ".idx"
+            self._offsets[shard] = self._open(name, _OFFSET_DTYPE)
+        return self._offsets[shard]
+
+    def document(self, i: int) -> np.ndarray:
+        """Tokens of document i, counted across all shards."""
+        if i < 0:
+            i += self.num_documents
+        if not 0 <= i < self.num_documents:
+            raise IndexError(f"document {i} out of range for {self.num_documents}")
+        shard = int(np.searchsorted(self._doc_starts, i, "right")) - 1
+        offsets = self.document_offsets(shard)
+        local = i - int(self._doc_starts[shard])
+        return self.shards[shard][int(offsets[local]) : int(offsets[local + 1])]
@@ -1,10 +1,245 @@
 """Utility functions for processing and saving large text files."""
 
+import bz2
+import gzip
+import io
+import lzma
 import os
-from typing import Callable, Iterator, Optional
+import queue
+import threading
+from typing import IO, Callable, Iterator, Optional, Tuple
 
 from tqdm import tqdm
 
+_DONE = object()
+
+
+class _Prefetcher:
+    """
+    Run a generator on a background thread, buffering up to `depth` items.
+
+    Exceptions raised by the generator are re-raised in the consumer, and
+    closing the consumer (or calling close(), which also works before the
+    first item is read) stops the thread.
+    """
+
+    def __init__(self, source: Iterator, depth: int = 2):
+        self._source = source
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        try:
+            for item in self._source:
+                if not self._put((item, None)):
+                    return
+        except BaseException as e:  # handed to the consumer
+            self._put((_DONE, e))
+            return
+        self._put((_DONE, None))
+
+    def __iter__(self):
+        try:
+            while True:
+                item, error = self._queue.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the background thread and wait for it to finish."""
+        self._stop.set()
+        self._thread.join()
+
+
+# Codecs picked by file extension, with the level used when none is given.
+COMPRESSION_CODECS = {
+    ".gz": ("gzip", 6),
+    ".bz2": ("bz2", 9),
+    ".xz": ("xz", 6),
+}
+
+
+def compression_of(path: str) -> Optional[str]:
+    """Return "gzip", "bz2", "xz" or None for a plain file, from the extension."""
+    codec = COMPRESSION_CODECS.get(os.path.splitext(path)[1].lower())
+    return codec[0] if codec else None
+
+
+class _ThreadedDecompressor(io.RawIOBase):
+    """
+    Raw stream over a decompressing file that decompresses on a background thread.
+
+    zlib, bz2 and lzma release the GIL while decompressing, so the next
+    blocks are decompressed while the caller parses the current one.
+    """
+
+    def __init__(self, stream: IO[bytes], block_size: int = 1024 * 1024):
+        self._stream = stream
+        self._prefetcher = _Prefetcher(
+            iter(lambda: stream.read(block_size), b""), depth=4
+        )
+        self._blocks = iter(self._prefetcher)
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._buffer:
+            block = next(self._blocks, b"")
+            if not block:
+                return 0
+            self._buffer = memoryview(block)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            # A generator closed before its first item never runs its
+            # finally block, so the thread is stopped directly.
+            self._blocks.close()
+            self._prefetcher.close()
+            self._stream.close()
+        super().close()
+
+
+def open_file(
+    path: str,
+    mode: str = "rt",
+    encoding: Optional[str] = "utf-8",
+    compresslevel: Optional[int] = None,
+    threaded: bool = True,
+    buffering: int = -1,
+) -> IO:
+    """
+    Open a plain, gzip, bz2 or xz file, picking the codec from the extension.
+
+    Compressed files are streamed, never decompressed to disk. Appending to a
+    compressed file adds a new stream, which all three formats read back as
+    one continuous file.
+
+    Args:
+        path: File path; ".gz", ".bz2" and ".xz" files are compressed
+        mode: "r", "w", "a" or "x", plus "t" (default) or "b"
+        encoding: Text encoding (ignored in binary mode)
+        compresslevel: Compression level for writing (gzip/bz2: 1-9, xz
+            preset: 0-9); defaults to the codec's entry in COMPRESSION_CODECS
+        threaded: Decompress on a background thread when reading
+        buffering: Buffer size in bytes (-1 for the default)
+
+    Returns:
+        File object; text mode unless "b" is in mode
+    """
+    codec = compression_of(path)
+    binary = "b" in mode
+    base_mode = mode.replace("t", "").replace("b", "")
+    if base_mode not in ("r", "w", "a", "x"):
+        raise ValueError(f"Unsupported mode: {mode}")
+
+    if codec is None:
+        if binary:
+            return open(path, base_mode + "b", buffering=buffering)
+        return open(path, base_mode, encoding=encoding, buffering=buffering)
+
+    if base_mode == "r":
+        if codec == "gzip":
+            stream = gzip.open(path, "rb")
+        elif codec == "bz2":
+            stream = bz2.open(path, "rb")
+        else:
+            stream = lzma.open(path, "rb")
+        if threaded:
+            block_size = buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE * 128
+            stream = io.BufferedReader(
+                _ThreadedDecompressor(stream, block_size), block_size
+            )
+    else:
+        if compresslevel is None:
+            compresslevel = COMPRESSION_CODECS[os.path.splitext(path)[1].lower()][1]
+        if codec == "gzip":
+            stream = gzip.open(path, base_mode + "b", compresslevel=compresslevel)
+        elif codec == "bz2":
+            stream = bz2.open(path, base_mode + "b", compresslevel=compresslevel)
+        else:
+            stream = lzma.open(path, base_mode + "b", preset=compresslevel)
+
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding)
+
+
+def _read_line_aligned(
+    file_path: str, chunk_size: int, encoding: str
+) -> Iterator[Tuple[str, int]]:
+    """Read bytes, cut them after the last newline and decode each piece once."""
+    with open_file(file_path, "rb") as file:
+        pending = b""
+        while True:
+            block = file.read(chunk_size)
+            if not block:
+                break
+            data = pending + block
+            cut = data.rfind(b"\n") + 1
+            if not cut:
+                # No line end yet: keep reading until the line is complete.
+                pending = data
+                continue
+            pending = data[cut:]
+            yield data[:cut].decode(encoding), cut
+        if pending:
+            yield pending.decode(encoding), len(pending)
+
+
+def read_line_chunks(
+    file_path: str,
+    chunk_size: int = 1024 * 1024,
+    encoding: str = "utf-8",
+    prefetch: int = 2,
+) -> Iterator[Tuple[str, int]]:
+    """
+    Read a file in chunks that always end at a line boundary.
+
+    Bytes are split after the last newline of each block (a line longer than
+    chunk_size makes its chunk longer), so no line, word or multi-byte
+    character is ever cut in two. The next chunks are read and decoded on a
+    background thread while the caller processes the current one.
+
+    Args:
+        file_path: Path to the text file (an ASCII-compatible encoding),
+            optionally compressed (see open_file())
+        chunk_size: Approximate chunk size in bytes
+        encoding: File encoding
+        prefetch: Chunks read ahead (0 reads in the calling thread)
+
+    Yields:
+        Tuples of (text, number of bytes it was decoded from)
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"The file '{file_path}' does not exist.")
+
+    chunks = _read_line_aligned(file_path, chunk_size, encoding)
+    if prefetch > 0:
+        chunks = iter(_Prefetcher(chunks, prefetch))
+    yield from chunks
+
 
 def process_large_file(
     file_path: str,
@@ -12,16 +247,21 @@ def process_large_file(
     processor: Optional[Callable[[str], str]] = None,
     encoding: str = "utf-8",
     show_progress: bool = True,
+    prefetch: int = 2,
 ) -> Iterator[str]:
     """
     Process a large text file in chunks to avoid memory issues.
 
+    Chunks end at line boundaries (see read_line_chunks()), so a processor
+    never sees a line cut in two.
+
     Args:
         file_path (str): Path to the text file.
         chunk_size (int): Size of chunks to read (in bytes).
         processor (Callable[[str], str], optional): Function to process chunks.
         encoding (str): File encoding (default: 'utf-8').
         show_progress (bool): Whether to show a progress bar.
+        prefetch (int): Chunks read ahead on a background thread.
 
     Yields:
         str: Processed text chunks.
@@ -29,22 +269,53 @@ def process_large_file(
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"The file '{file_path}' does not exist.")
 
-    file_size = os.path.getsize(file_path)
+    # Progress counts decompressed bytes, so a compressed size is no total.
+    file_size = None if compression_of(file_path) else os.path.getsize(file_path)
 
-    with open(file_path, "r", encoding=encoding) as file:
-        with tqdm(
-            total=file_size, disable=not show_progress, unit="B", unit_scale=True
-        ) as pbar:
-            while True:
-                chunk = file.read(chunk_size)
-                if not chunk:
-                    break
+    with tqdm(
+        total=file_size, disable=not show_progress, unit="B", unit_scale=True
+    ) as pbar:
+        for chunk, num_bytes in read_line_chunks(
+            file_path, chunk_size, encoding, prefetch
+        ):
+            if processor:
+                chunk = processor(chunk)
+
+            pbar.update(num_bytes)
+            yield chunk
+
+
+class _BackgroundWriter:
+    """Write text on a background thread so output I/O overlaps processing."""
 
-                if processor:
-                    chunk = processor(chunk)
+    def __init__(self, file, depth: int = 4):
+        self._file = file
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
 
-                pbar.update(len(chunk.encode(encoding)))
-                yield chunk
+    def _run(self) -> None:
+        while True:
+            text = self._queue.get()
+            if text is _DONE:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(text)
+                except BaseException as e:  # re-raised by write()/close()
+                    self._error = e
+
+    def write(self, text: str) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(text)
+
+    def close(self) -> None:
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
 
 
 def save_processed_text(
@@ -54,10 +325,16 @@ def save_processed_text(
     chunk_size: int = 1024 * 1024,
     encoding: str = "utf-8",
     show_progress: bool = True,
+    prefetch: int = 2,
+    compresslevel: Optional[int] = None,
 ) -> None:
     """
     Process a large text file and save results to another file.
 
+    Reading (with prefetch), processing and writing run concurrently: the
+    next chunks are read on one background thread and finished chunks are
+    written through a buffered file on another.
+
     Args:
         input_path (str): Path to the input file.
         output_path (str): Path to save the processed text.
@@ -65,19 +342,33 @@ def save_processed_text(
         chunk_size (int): Size of chunks to read.
         encoding (str): File encoding.
         show_progress (bool): Whether to show a progress bar.
+        prefetch (int): Chunks read ahead on a background thread.
+        compresslevel (int, optional): Level used when output_path has a
+            compression extension (see open_file()).
     """
     # Ensure the output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    with open(output_path, "w", encoding=encoding) as out_file:
-        for chunk in process_large_file(
-            input_path,
-            chunk_size=chunk_size,
-            processor=processor,
-            encoding=encoding,
-            show_progress=show_progress,
-        ):
-            out_file.write(chunk)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    with open_file(
+        output_path,
+        "w",
+        encoding=encoding,
+        compresslevel=compresslevel,
+        buffering=max(chunk_size, 1 << 16),
+    ) as out_file:
+        writer = _BackgroundWriter(out_file)
+        try:
+            for chunk in process_large_file(
+                input_path,
+                chunk_size=chunk_size,
+                processor=processor,
+                encoding=encoding,
+                show_progress=show_progress,
+                prefetch=prefetch,
+            ):
+                writer.write(chunk)
+        finally:
+            writer.close()
 
 
 def read_balochi_file(file_path: str, encoding: str = "utf-8") -> list:
@@ -85,14 +376,14 @@ def read_balochi_file(file_path: str, encoding: str = "utf-8") -> list:
     Read a Balochi text file and return lines.
 
     Args:
-        file_path: Path to the text file
+        file_path: Path to the text file (may be .gz/.bz2/.xz compressed)
         encoding: File encoding (default: 'utf-8')
 
     Returns:
         List of text lines
     """
     try:
-        with open(file_path, "r", encoding=encoding) as f:
+        with open_file(file_path, "r", encoding=encoding) as f:
             lines = [line.strip() for line in f if line.strip()]
         return lines
     except FileNotFoundError:
@@ -105,17 +396,23 @@ def read_balochi_file(file_path: str, encoding: str = "utf-8") -> list:
         raise Exception(f"Unable to decode {file_path} with {encoding} encoding")
 
 
-def write_balochi_file(file_path: str, data: list, encoding: str = "utf-8") -> None:
+def write_balochi_file(
+    file_path: str,
+    data: list,
+    encoding: str = "utf-8",
+    compresslevel: Optional[int] = None,
+) -> None:
     """
     Write data to a Balochi text file.
 
     Args:
-        file_path: Path to output file
+        file_path: Path to output file (compressed for .gz/.bz2/.xz)
         data: List of text lines to write
         encoding: File encoding (default: 'utf-8')
+        compresslevel: Compression level, see open_file()
     """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
 
-    with open(file_path, "w", encoding=encoding) as f:
+    with open_file(file_path, "w", encoding=encoding, compresslevel=compresslevel) as f:
         for line in data:
             f.write(line + "\n")
@@ -0,0 +1,85 @@
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(current_path))
+
+# Third-party packages that `import balnlp` alone must never load
+HEAVY_MODULES = ("numpy", "regex", "tqdm", "sentencepiece", "jax")
+
+# Runs in a fresh interpreter: time `import balnlp` and list what it loaded.
+IMPORT_PROBE = """
+import sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+import balnlp
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(sorted(set(sys.modules) - before)))
+"""
+
+# Time the first access of one lazily exported name.
+ACCESS_PROBE = """
+import time
+import balnlp
+start = time.perf_counter()
+getattr(balnlp, {name!r})
+print(time.perf_counter() - start)
+"""
+
+
+def run_probe(code):
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=current_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.splitlines()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure `import balnlp` startup cost."
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--max-ms", type=float, default=None,
+        help="Exit with an error if the median import time exceeds this",
+    )
+    args = parser.parse_args()
+
+    timings = []
+    loaded = []
+    for _ in range(args.repeat):
+        elapsed, modules = run_probe(IMPORT_PROBE)
+        timings.append(float(elapsed) * 1000)
+        loaded = modules.split(",") if modules else []
+
+    median = statistics.median(timings)
+    print(f">>> import balnlp: median {median:.2f} ms, min {min(timings):.2f} ms "
+          f"over {args.repeat} fresh interpreters")
+    print(f"    modules loaded: {', '.join(loaded)}")
+
+    import balnlp  # noqa: E402
+
+    print(">>> First access of each export (includes its submodule imports):")
+    for name in balnlp.__all__:
+        (elapsed,) = run_probe(ACCESS_PROBE.format(name=name))
+        print(f"    {name:<28}{float(elapsed) * 1000:>9.1f} ms")
+
+    heavy = [m for m in loaded if m.split(".")[0] in HEAVY_MODULES]
+    if heavy:
+        print(f"ERROR: import balnlp pulled in {heavy}")
+        sys.exit(1)
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"ERROR: median import time {median:.2f} ms exceeds {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import re
+import sys
+import time
+from pathlib import Path
+
+current_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(current_path))
+
+from balnlp.preprocessing.normalizer import BalochiTextNormalizer
+
+
+class LegacyNormalizer(BalochiTextNormalizer):
+    """The replace-loop implementation, kept here as the baseline."""
+
+    def normalize_chars(self, text):
+        for original, normalized in self.char_maps.items():
+            text = text.replace(original, normalized)
+        return text
+
+    def remove_diacritics(self, text):
+        for d in self.diacritics:
+            text = text.replace(d, "")
+        return text
+
+    def normalize_spaces(self, text):
+        text = " ".join(text.split())
+        text = re.sub(rf"\s+([{re.escape(self.punctuations)}])", r"\1", text)
+        text = re.sub(rf"([{re.escape(self.punctuations)}])(?=\S)", r"\1 ", text)
+        return text.strip()
+
+    def normalize_text(self, text, remove_diacritics=False):
+        text = self.normalize_chars(text)
+        if remove_diacritics:
+            text = self.remove_diacritics(text)
+        return self.normalize_spaces(text)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    INPUT_FILE = current_path / "data" / "tbp_nebeshtank.txt"
+    REPEAT = 20
+    WORKERS = 4
+
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines() * REPEAT
+    print(f">>> Benchmarking on {len(lines):,} lines")
+
+    legacy = LegacyNormalizer()
+    fast = BalochiTextNormalizer()
+
+    for remove_diacritics in (False, True):
+        expected, t_legacy = timed(
+            lambda: [legacy.normalize_text(t, remove_diacritics) for t in lines]
+        )
+        result, t_fast = timed(fast.normalize_corpus, lines, remove_diacritics)
+        parallel, t_parallel = timed(
+            fast.normalize_corpus, lines, remove_diacritics, WORKERS
+        )
+
+        assert result == expected, "compiled output differs from legacy"
+        assert parallel == expected, "parallel output differs from legacy"
+
+        print(f"remove_diacritics={remove_diacritics}")
+        print(f"   legacy loop:           {t_legacy:.3f}s")
+        print(f"   compiled tables:       {t_fast:.3f}s ({t_legacy / t_fast:.1f}x)")
+        print(
+            f"   {WORKERS} worker processes:    {t_parallel:.3f}s "
+            f"({t_legacy / t_parallel:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+current_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(current_path))
+
+from balnlp.preprocessing.stopwords import BalochiStopwordRemover
+
+
+def legacy_remove(remover, text):
+    """The original per-word path, kept here as the baseline."""
+    words = text.split()
+    return " ".join(word for word in words if not remover.is_stopword(word))
+
+
+def reference_remove(stopwords, text):
+    """Greedy longest-match phrase removal, one position at a time."""
+    phrases = sorted((s.split() for s in stopwords), key=len, reverse=True)
+    words = text.split()
+    kept = []
+    i = 0
+    while i < len(words):
+        for phrase in phrases:
+            if words[i : i + len(phrase)] == phrase:
+                i += len(phrase)
+                break
+        else:
+            kept.append(words[i])
+            i += 1
+    return " ".join(kept)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    INPUT_FILE = current_path / "data" / "tbp_nebeshtank.txt"
+    REPEAT = 20
+    NUM_STOPWORDS = 200
+
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines() * REPEAT
+    print(f">>> Benchmarking on {len(lines):,} lines")
+
+    # The most frequent words stand in for a stopword list.
+    sample = lines[: len(lines) // REPEAT]
+    counts = Counter(word for line in sample for word in line.split())
+    stopwords = {word for word, _ in counts.most_common(NUM_STOPWORDS)}
+    remover = BalochiStopwordRemover(custom_stopwords=stopwords)
+
+    expected, t_legacy = timed(lambda: [legacy_remove(remover, t) for t in lines])
+    result, t_batch = timed(remover.remove_batch, lines)
+    assert result == expected, "compiled output differs from legacy"
+
+    print(f"single-word stopwords ({len(remover.stopwords)})")
+    print(f"   legacy per-word loop:  {t_legacy:.3f}s")
+    print(f"   remove_batch:          {t_batch:.3f}s ({t_legacy / t_batch:.1f}x)")
+
+    # Multi-word entries built from frequent bigrams; only the trie path can match them.
+    bigrams = Counter(
+        pair
+        for line in lines[: len(lines) // REPEAT]
+        for pair in zip(line.split(), line.split()[1:])
+    )
+    remover.add_stopwords({" ".join(pair) for pair, _ in bigrams.most_common(50)})
+    result, t_phrases = timed(remover.remove_batch, lines)
+    expected = [reference_remove(remover.stopwords, t) for t in lines[:2000]]
+    assert result[:2000] == expected, "phrase matching differs from the reference"
+    print(f"with {len(remover.compile().phrases)} multi-word phrases")
+    print(f"   remove_batch:          {t_phrases:.3f}s (no legacy equivalent)")
+
+
+if __name__ == "__main__":
+    main()
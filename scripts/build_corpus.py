@@ -1,14 +1,27 @@
 import os
 import sys
 import glob
+import json
+import shutil
+import hashlib
+import argparse
+from collections import deque
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from balnlp.preprocessing.cleaner import BalochiTextCleaner
-from balnlp.preprocessing.normalizer import BalochiTextNormalizer
-from balnlp.dedup.exact import ExactDeduplicator
-from balnlp.dedup.minhash import NearDeduplicator
+from balnlp.dedup.digest_store import DigestStore
+from balnlp.dedup.exact import ExactDedup
+from balnlp.dedup.minhash import NearDedup
+from balnlp.utils.utils_file import compression_of, open_file
+from balnlp.pipeline import (
+    CleanStage,
+    ExactDedupStage,
+    MinWordsStage,
+    NearDedupStage,
+    NormalizeStage,
+    Pipeline,
+)
 
 # ==========================
 # SETTINGS
@@ -16,98 +29,697 @@ from balnlp.dedup.minhash import NearDeduplicator
 INPUT_DIR = "/home/python-dev/BalNLP/data"
 OUTPUT_PATH = "/home/python-dev/BalNLP/corpus/balochi_corpus.txt"
 USE_NEAR_DEDUP = True
+# Near-dedup index kept between runs, so new crawls are checked against old
+# ones (--near-index; None = off, every run starts with an empty index)
+NEAR_DEDUP_INDEX = None
+# Digests of every line ever published, so lines from earlier corpora are
+# skipped (--exact-store; None = off, every run rebuilds the whole corpus)
+EXACT_DEDUP_STORE = None
+BATCH_SIZE = 1000
+MIN_WORDS = 2
+# Worker processes for cleaning/normalization (1 = serial, same output either way)
+NUM_WORKERS = 1
+# Batches between checkpoints (0 disables checkpointing and --resume)
+CHECKPOINT_EVERY = 100
+# Inputs may be compressed; the output is compressed if OUTPUT_PATH ends in .gz/.bz2/.xz
+INPUT_PATTERNS = ("*.txt", "*.txt.gz", "*.txt.bz2", "*.txt.xz")
 
 
-def main():
-    print(f">>> Initializing Advanced Pipeline...")
+def read_batches(input_files, batch_size, start_file=0, start_offset=0):
+    """
+    Yield (batch, position) pairs of stripped lines from every input file.
 
-    # 1. Init Components
-    cleaner = BalochiTextCleaner()
-    normalizer = BalochiTextNormalizer()
-    exact_dedup = ExactDeduplicator()
+    Files are read as bytes so that position, the (file index, byte offset)
+    just past the batch's last line, is exactly where a resumed run starts.
+    """
+    batch = []
+    position = (start_file, start_offset)
+    for file_index in range(start_file, len(input_files)):
+        file_path = input_files[file_index]
+        offset = start_offset if file_index == start_file else 0
+        print(f"    -> Processing file: {os.path.basename(file_path)}")
+        try:
+            with open_file(file_path, 'rb') as f_in:
+                skip_to(f_in, offset)
+                for raw_line in f_in:
+                    offset += len(raw_line)
+                    batch.append(raw_line.decode('utf-8').strip())
+                    if len(batch) >= batch_size:
+                        yield batch, (file_index, offset)
+                        batch = []
+        except Exception as e:
+            print(f"    [WARNING] Could not read file {file_path}: {e}")
+        position = (file_index, offset)
+    if batch:
+        yield batch, position
+
+
+def skip_to(f_in, offset, block_size=1 << 20):
+    """Move to a byte offset, by decompressing up to it if the file can't seek."""
+    if f_in.seekable():
+        f_in.seek(offset)
+        return
+    while offset > 0:
+        skipped = len(f_in.read(min(offset, block_size)))
+        if not skipped:
+            break
+        offset -= skipped
+
+
+class CorpusWriter:
+    """
+    Output corpus, plain or compressed, that can be made durable at any point.
+
+    sync() returns a length the file can later be truncated back to. For a
+    compressed corpus it finishes the current compressed stream; writing
+    continues in a new appended stream, which readers see as one file.
+    """
+
+    def __init__(self, path, append=False, compresslevel=None):
+        self.path = path
+        self.compresslevel = compresslevel
+        self.compressed = compression_of(path) is not None
+        self._file = self._open('ab' if append else 'wb')
+
+    def _open(self, mode):
+        return open_file(self.path, mode, compresslevel=self.compresslevel)
+
+    def write_lines(self, lines):
+        self._file.write(("\n".join(lines) + "\n").encode('utf-8'))
+
+    def sync(self):
+        if self.compressed:
+            self._file.close()
+            with open(self.path, 'rb') as f:
+                os.fsync(f.fileno())
+            length = os.path.getsize(self.path)
+            self._file = self._open('ab')
+            return length
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def truncate_output(path, length):
+    with open(path, 'r+b') as f_out:
+        f_out.truncate(length)
+
+
+class Checkpoint:
+    """
+    Atomic snapshots of a running build, kept in <output>.checkpoint/.
+
+    state.json records the resume position, the output length, the counters
+    and where the dedup state of that moment lives. It is replaced atomically
+    only after everything it refers to has been written, so a crash at any
+    point leaves the previous snapshot intact.
+    """
+
+    def __init__(self, output_path):
+        self.directory = output_path + ".checkpoint"
+        self.state_path = os.path.join(self.directory, "state.json")
+
+    def exists(self):
+        return os.path.exists(self.state_path)
+
+    def load(self):
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def file_path(self, name, seq):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{name}-{seq:06d}")
+
+    def save(self, state):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+        # Dedup snapshots of earlier checkpoints are no longer needed.
+        live = {os.path.abspath(p) for p in state["state_files"].values() if p}
+        live.add(os.path.abspath(self.state_path))
+        for name in os.listdir(self.directory):
+            path = os.path.abspath(os.path.join(self.directory, name))
+            if path not in live:
+                os.remove(path)
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def run_start_segments(run_start):
+    """Digest store segments a --restart would roll back to."""
+    if run_start is None or run_start["exact_dedup_store"] is None:
+        return []
+    return run_start["exact_dedup_store"]["segments"]
+
+
+def restart_build(args, checkpoint):
+    """
+    Undo an interrupted build: roll its digest store and output back to how
+    they were when it started, then delete its checkpoint.
+    """
+    state = checkpoint.load()
+    run_start = state["run_start"]
+    store_path = state["settings"]["exact_dedup_store"]
+    if store_path:
+        DigestStore(store_path).rollback(run_start["exact_dedup_store"])
+    if os.path.exists(args.output):
+        truncate_output(args.output, run_start["output_offset"])
+    checkpoint.remove()
+    print(f">>> Discarded the interrupted build at {checkpoint.directory}")
+
+
+def find_input_files(input_dir, output_path):
+    """Sorted .txt files of input_dir, so the corpus line order is deterministic."""
+    # This will find raw_data.txt, tbp_nebeshtank.txt.gz, etc.
+    input_files = sorted(
+        path
+        for pattern in INPUT_PATTERNS
+        for path in glob.glob(os.path.join(input_dir, pattern))
+    )
+    # Filter out the output file if it already exists in the same folder to avoid loop
+    output_name = os.path.basename(output_path)
+    return [f for f in input_files if os.path.basename(f) != output_name]
+
+
+def pre_dedup_stages():
+    """
+    The stateless stages run before dedup.
+
+    With --workers they run in worker processes, and with --incremental their
+    output is cached per input file.
+    """
+    return [CleanStage(remove_numbers=True)]
+
+
+def post_dedup_stages(args):
+    """The stateless stages run after dedup (in worker processes with --workers)."""
+    return [
+        NormalizeStage(),
+        MinWordsStage(args.min_words),
+    ]
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IncrementalCache:
+    """
+    Per-file intermediates and dedup state of incremental builds, kept in
+    <output>.cache/.
 
+    manifest.json maps every input path to its size, mtime and SHA-256, and
+    describes the corpus last written: the content hashes it was built
+    from (in order), the output length and the dedup state after it.
+    intermediate/<sha256>.txt holds a file's lines after the pre-dedup
+    stages, so an unchanged file is never read or cleaned again, wherever it
+    moves. The manifest is replaced atomically after everything it refers
+    to has been written.
+    """
+
+    def __init__(self, output_path):
+        self.directory = output_path + ".cache"
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self.intermediate_dir = os.path.join(self.directory, "intermediate")
+        os.makedirs(self.intermediate_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"settings": None, "files": {}, "corpus": None}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def intermediate_path(self, sha256):
+        return os.path.join(self.intermediate_dir, sha256 + ".txt")
+
+    def reset(self, settings):
+        """Forget everything if the stages were configured differently."""
+        if self.manifest["settings"] != settings:
+            self.manifest = {"settings": settings, "files": {}, "corpus": None}
+            # Intermediates of the old settings must not be found by hash.
+            for name in os.listdir(self.intermediate_dir):
+                os.remove(os.path.join(self.intermediate_dir, name))
+
+    def content_hash(self, path):
+        """SHA-256 of a file, reusing the recorded one while size and mtime match."""
+        st = os.stat(path)
+        entry = self.manifest["files"].get(os.path.abspath(path))
+        if (
+            entry
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+        ):
+            return entry["sha256"]
+        sha256 = file_sha256(path)
+        self.manifest["files"][os.path.abspath(path)] = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256,
+        }
+        return sha256
+
+    def has_intermediate(self, sha256):
+        return os.path.exists(self.intermediate_path(sha256))
+
+    def write_intermediate(self, sha256, batches):
+        """Atomically store the pre-dedup stage output of one file."""
+        path = self.intermediate_path(sha256)
+        with open(path + ".tmp", 'wb') as f:
+            for batch in batches:
+                if batch:
+                    f.write(("\n".join(batch) + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def read_intermediates(self, hashes, batch_size):
+        """Yield the cached lines of the given files in batches."""
+        batch = []
+        for sha256 in hashes:
+            with open(self.intermediate_path(sha256), 'r', encoding='utf-8') as f:
+                for line in f:
+                    batch.append(line.rstrip("\n"))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        if batch:
+            yield batch
+
+    def save(self, input_files, corpus):
+        """Record the new corpus and drop files that nothing refers to anymore."""
+        live_paths = {os.path.abspath(f) for f in input_files}
+        self.manifest["files"] = {
+            path: entry
+            for path, entry in self.manifest["files"].items()
+            if path in live_paths
+        }
+        self.manifest["corpus"] = corpus
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+        live_hashes = {entry["sha256"] for entry in self.manifest["files"].values()}
+        for name in os.listdir(self.intermediate_dir):
+            if name[:-len(".txt")] not in live_hashes:
+                os.remove(os.path.join(self.intermediate_dir, name))
+        state_files = {
+            corpus["exact_dedup"],
+            corpus["near_dedup"],
+            "manifest.json",
+            "intermediate",
+        }
+        for name in os.listdir(self.directory):
+            if name not in state_files:
+                os.remove(self.path(name))
+
+
+def build_incremental(args, input_files):
+    """
+    Rebuild the corpus reprocessing only new or changed input files.
+
+    Files whose content hash has a cached intermediate skip the pre-dedup
+    stages. If the previous corpus was built from a prefix of the current
+    file list, its dedup state is reloaded and only the new files are
+    deduplicated and appended; otherwise dedup is re-run over the cached
+    intermediates. Dedup state lives in the cache, --exact-store and
+    --near-index are not used.
+    """
+    cache = IncrementalCache(args.output)
+    cache.reset({
+        "cached_stages": ["clean"],
+        "clean": {"remove_numbers": True},
+        "min_words": args.min_words,
+    })
+
+    # 1. Pre-dedup stages, for files without a cached intermediate only
+    prefix = Pipeline(pre_dedup_stages(), batch_size=args.batch_size)
+    num_workers = args.workers or None
+    hashes = []
+    reprocessed = 0
+    for file_path in input_files:
+        sha256 = cache.content_hash(file_path)
+        hashes.append(sha256)
+        if cache.has_intermediate(sha256):
+            print(f"    -> Cached: {os.path.basename(file_path)}")
+            continue
+        batches = (batch for batch, _ in read_batches([file_path], args.batch_size))
+        cache.write_intermediate(sha256, prefix.run_batches(batches, num_workers))
+        reprocessed += 1
+
+    # 2. Dedup, continuing from the previous corpus when it is a prefix of this one
+    exact_dedup = ExactDedup()
     near_dedup = None
     if USE_NEAR_DEDUP:
-        print(">>> Initializing LSH (MinHash) for Near-Deduplication...")
-        near_dedup = NearDeduplicator(threshold=0.85)
+        near_dedup = NearDedup(threshold=0.85, method="minhash")
 
-    total_count = 0
+    corpus = cache.manifest["corpus"]
+    done = 0
     saved_count = 0
-    dropped_exact = 0
-    dropped_near = 0
+    if (
+        corpus
+        and corpus["near_dedup_enabled"] == USE_NEAR_DEDUP
+        and corpus["files"] == hashes[:len(corpus["files"])]
+        and os.path.exists(args.output)
+        and os.path.getsize(args.output) >= corpus["output_offset"]
+    ):
+        exact_dedup.load_state(cache.path(corpus["exact_dedup"]))
+        if corpus["near_dedup"]:
+            near_dedup = NearDedup.load_index(cache.path(corpus["near_dedup"]))
+        done = len(corpus["files"])
+        saved_count = corpus["saved_count"]
+        truncate_output(args.output, corpus["output_offset"])
+        print(f">>> Appending {len(hashes) - done} new file(s) to the previous corpus")
+    else:
+        print(f">>> Deduplicating all {len(hashes)} file(s) from the cache")
 
-    # 2. Find all .txt files in the directory
-    # This will find raw_data.txt, tbp_nebeshtank.txt, etc.
-    input_files = glob.glob(os.path.join(INPUT_DIR, "*.txt"))
+    stages = [ExactDedupStage(exact_dedup)]
+    if near_dedup:
+        stages.append(NearDedupStage(near_dedup))
+    stages += post_dedup_stages(args)
+    dedup = Pipeline(stages, batch_size=args.batch_size)
 
-    # Filter out the output file if it already exists in the same folder to avoid loop
-    input_files = [f for f in input_files if os.path.basename(f) != os.path.basename(OUTPUT_PATH)]
+    writer = CorpusWriter(
+        args.output, append=bool(done), compresslevel=args.compresslevel
+    )
+    try:
+        intermediates = cache.read_intermediates(hashes[done:], args.batch_size)
+        for kept in dedup.run_batches(intermediates, num_workers):
+            if kept:
+                writer.write_lines(kept)
+                saved_count += len(kept)
+        output_offset = writer.sync()
+    finally:
+        writer.close()
+
+    # 3. Save the dedup state under fresh names, then switch the manifest to it
+    seq = corpus["seq"] + 1 if corpus else 0
+    exact_file = f"exact_dedup-{seq:06d}.bin"
+    exact_dedup.save_state(cache.path(exact_file))
+    near_file = None
+    if near_dedup:
+        near_file = f"near_dedup-{seq:06d}.lsh"
+        near_dedup.save_index(cache.path(near_file))
+    cache.save(input_files, {
+        "seq": seq,
+        "files": hashes,
+        "output_offset": output_offset,
+        "saved_count": saved_count,
+        "near_dedup_enabled": USE_NEAR_DEDUP,
+        "exact_dedup": exact_file,
+        "near_dedup": near_file,
+    })
 
+    print("=" * 40)
+    print("INCREMENTAL BUILD COMPLETE")
+    print(f"Files Reprocessed:      {reprocessed} of {len(input_files)}")
+    print(f"Final Clean Lines:      {saved_count}")
+    print(f"Saved to:               {args.output}")
+    print("=" * 40)
+    print(prefix.report())
+    print(dedup.report())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the Balochi training corpus.")
+    parser.add_argument("--input-dir", default=INPUT_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument(
+        "--workers", type=int, default=NUM_WORKERS,
+        help="Processes that clean and normalize line batches (0 = one per CPU)",
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--min-words", type=int, default=MIN_WORDS)
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+        help="Batches between checkpoints (0 = no checkpoints)",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue an interrupted build from its last checkpoint",
+    )
+    parser.add_argument(
+        "--restart", action="store_true",
+        help="Discard an interrupted build and start over, rolling --exact-store "
+             "and the output back to where that build started",
+    )
+    parser.add_argument(
+        "--compresslevel", type=int, default=None,
+        help="Compression level when --output ends in .gz, .bz2 or .xz",
+    )
+    parser.add_argument(
+        "--exact-store", default=EXACT_DEDUP_STORE, metavar="PATH",
+        help="Digest store of every line already published: lines found in it "
+             "are skipped, new lines are appended to --output and added to it. "
+             "A full rebuild needs a fresh (empty or new) store",
+    )
+    parser.add_argument(
+        "--near-index", default=NEAR_DEDUP_INDEX, metavar="PATH",
+        help="Near-dedup LSH index kept between runs: loaded and extended if it "
+             "exists, saved at the end. Lines near-duplicating earlier runs are "
+             "dropped, so leave it out (or use a new path) to rebuild",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Cache per-file results in <output>.cache/ and only reprocess "
+             "new or changed input files",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f">>> Initializing Advanced Pipeline...")
+
+    input_files = find_input_files(args.input_dir, args.output)
     if not input_files:
-        print(f"ERROR: No .txt files found in {INPUT_DIR}")
+        print(f"ERROR: No .txt (or compressed .txt) files found in {args.input_dir}")
+        return
+
+    names = [os.path.basename(f) for f in input_files]
+    print(f">>> Found {len(input_files)} files: {names}")
+
+    if args.incremental:
+        if args.resume:
+            print("ERROR: --incremental builds keep their own cache "
+                  "and cannot --resume")
+            return
+        if args.exact_store or args.near_index:
+            print("ERROR: --incremental builds keep their own dedup state "
+                  "and cannot use --exact-store or --near-index")
+            return
+        build_incremental(args, input_files)
         return
 
-    print(f">>> Found {len(input_files)} files: {[os.path.basename(f) for f in input_files]}")
+    checkpoint = Checkpoint(args.output) if args.checkpoint_every > 0 else None
+    resume_state = None
+    if args.resume and args.restart:
+        print("ERROR: Pass only one of --resume and --restart")
+        return
+    if checkpoint and checkpoint.exists():
+        if args.restart:
+            restart_build(args, checkpoint)
+        elif not args.resume:
+            print(f"ERROR: Found an interrupted build at {checkpoint.directory}")
+            print("       Pass --resume to continue it, or --restart to start over.")
+            print("       (Deleting it is not enough with --exact-store: the store")
+            print("       already holds the lines of the interrupted build.)")
+            return
+        else:
+            resume_state = checkpoint.load()
+    elif args.resume:
+        print(f"ERROR: --resume given but no checkpoint found for {args.output}")
+        return
+
+    # 1. Init Components
+    # The store keeps segments replaced by compaction until a checkpoint no
+    # longer refers to them, so it can always be rolled back to one.
+    digest_store = None
+    if args.exact_store:
+        print(f">>> Skipping lines already in {args.exact_store}; "
+              f"new lines are appended to {args.output}")
+        digest_store = DigestStore(
+            args.exact_store, keep_replaced=checkpoint is not None
+        )
+    exact_dedup = ExactDedup(store=digest_store)
+
+    near_dedup = None
+    near_dedup_file = None
+    if USE_NEAR_DEDUP:
+        print(">>> Initializing LSH (MinHash) for Near-Deduplication...")
+        if resume_state:
+            near_dedup_file = resume_state["state_files"]["near_dedup"]
+        elif args.near_index and os.path.exists(args.near_index):
+            print(f">>> Extending existing index: {args.near_index}")
+            near_dedup_file = args.near_index
+        if near_dedup_file:
+            near_dedup = NearDedup.load_index(near_dedup_file)
+        else:
+            near_dedup = NearDedup(threshold=0.85, method="minhash")
 
-    # 3. Open Output File ONCE
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f_out:
+    def near_dedup_size():
+        if near_dedup is None or near_dedup.index is None:
+            return 0
+        return len(near_dedup.index)
 
-        # 4. Loop through each input file
-        for file_path in input_files:
-            print(f"    -> Processing file: {os.path.basename(file_path)}")
+    # Stages run in this order; each one reports its own drops and timing.
+    # Cleaning, normalization and the length filter are stateless, so with
+    # --workers they run in worker processes; dedup runs in this process on
+    # the ordered results, so the output does not depend on the worker count.
+    stages = pre_dedup_stages() + [ExactDedupStage(exact_dedup)]
+    if near_dedup:
+        stages.append(NearDedupStage(near_dedup))
+    stages += post_dedup_stages(args)
+    pipeline = Pipeline(stages, batch_size=args.batch_size)
 
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f_in:
-                    for line in f_in:
-                        total_count += 1
-                        original_line = line.strip()
+    # Everything that must match for a resumed run to continue the same build
+    settings = {
+        "input_files": [os.path.abspath(f) for f in input_files],
+        "batch_size": args.batch_size,
+        "min_words": args.min_words,
+        "near_dedup": bool(near_dedup),
+        "exact_dedup_store": args.exact_store,
+        "near_index": args.near_index,
+    }
+
+    # 3. Restore the checkpoint (or start from scratch) and stream every file
+    # through the pipeline. Dedup works across ALL files because its state is shared.
+    saved_count = 0
+    position = (0, 0)
+    seq = 0
+    # Store state and output length before this build, for --restart
+    run_start = None
+    if resume_state:
+        if resume_state["settings"] != settings:
+            print("ERROR: The checkpoint was written with different inputs or settings")
+            return
+        run_start = resume_state["run_start"]
+        if digest_store is not None:
+            digest_store.rollback(
+                resume_state["exact_dedup_store"], keep=run_start_segments(run_start)
+            )
+        else:
+            exact_dedup.load_state(resume_state["state_files"]["exact_dedup"])
+        pipeline.load_stats(resume_state["stats"])
+        saved_count = resume_state["saved_count"]
+        position = tuple(resume_state["position"])
+        seq = resume_state["seq"]
+        truncate_output(args.output, resume_state["output_offset"])
+        print(f">>> Resuming at file {position[0] + 1}, byte {position[1]:,} "
+              f"({saved_count:,} lines already written)")
 
-                        # --- STAGE 1: CLEANING ---
-                        cleaned_text = cleaner.clean_text(
-                            original_line,
-                            remove_english=True,
-                            remove_numbers=True
-                        )
-                        if cleaned_text is None:
-                            continue  # Garbage detected
+    # Size of the index stored in near_dedup_file
+    near_dedup_file_size = near_dedup_size()
 
-                        # --- STAGE 2: EXACT DEDUPLICATION ---
-                        # (Deduplication works across ALL files because exact_dedup is outside the loop)
-                        if not exact_dedup.process_single(cleaned_text):
-                            dropped_exact += 1
-                            continue
+    def save_checkpoint(writer):
+        nonlocal seq, near_dedup_file, near_dedup_file_size, run_start
+        seq += 1
+        output_offset = writer.sync()
 
-                        # --- STAGE 3: NEAR DEDUPLICATION ---
-                        if near_dedup:
-                            if not near_dedup.process_single(cleaned_text):
-                                dropped_near += 1
-                                continue
+        state_files = {"exact_dedup": None, "near_dedup": near_dedup_file}
+        store_state = None
+        if digest_store is not None:
+            store_state = digest_store.state()
+        else:
+            exact_file = checkpoint.file_path("exact_dedup", seq) + ".bin"
+            exact_dedup.save_state(exact_file)
+            state_files["exact_dedup"] = exact_file
+        # The index is only rewritten when documents were added since the last save.
+        if near_dedup_size() != near_dedup_file_size:
+            near_dedup_file = checkpoint.file_path("near_dedup", seq) + ".lsh"
+            near_dedup.save_index(near_dedup_file)
+            near_dedup_file_size = near_dedup_size()
+            state_files["near_dedup"] = near_dedup_file
+        if run_start is None:
+            run_start = {
+                "exact_dedup_store": store_state,
+                "output_offset": output_offset,
+            }
 
-                        # --- STAGE 4: NORMALIZATION ---
-                        final_text = normalizer.normalize(cleaned_text)
+        checkpoint.save({
+            "seq": seq,
+            "settings": settings,
+            "position": list(position),
+            "output_offset": output_offset,
+            "saved_count": saved_count,
+            "stats": pipeline.stats_state(),
+            "exact_dedup_store": store_state,
+            "state_files": state_files,
+            "run_start": run_start,
+        })
+        if digest_store is not None:
+            # Segments of the starting state stay restorable for --restart.
+            digest_store.discard_replaced(keep=run_start_segments(run_start))
 
-                        if len(final_text.split()) < 2:
-                            continue
+    num_workers = args.workers or None
+    positions = deque()
 
-                        # --- SAVE ---
-                        f_out.write(final_text + "\n")
-                        saved_count += 1
+    def batches():
+        read = read_batches(input_files, args.batch_size, *position)
+        for batch, batch_position in read:
+            positions.append(batch_position)
+            yield batch
 
-                        if total_count % 1000 == 0:
-                            print(f"       Processed {total_count} lines total...")
+    # With a digest store the output is the corpus of every run so far: the
+    # store holds its lines, so new ones are appended instead of replacing it.
+    append = bool(resume_state) or digest_store is not None
+    writer = CorpusWriter(args.output, append=append, compresslevel=args.compresslevel)
+    try:
+        if checkpoint and not resume_state:
+            save_checkpoint(writer)
+        # Checkpoints snapshot the dedup state after the last written batch,
+        # so the stages after dedup must not let it run ahead.
+        kept_batches = pipeline.run_batches(
+            batches(), num_workers, parallel_suffix=checkpoint is None
+        )
+        for batch_count, kept in enumerate(kept_batches, 1):
+            if kept:
+                writer.write_lines(kept)
+                saved_count += len(kept)
+            position = positions.popleft()
+            if checkpoint and batch_count % args.checkpoint_every == 0:
+                save_checkpoint(writer)
+        # A final checkpoint makes the steps below safe to repeat with --resume.
+        if checkpoint:
+            save_checkpoint(writer)
+    finally:
+        writer.close()
 
-            except Exception as e:
-                print(f"    [WARNING] Could not read file {file_path}: {e}")
+    if digest_store is not None:
+        digest_store.close()
+        digest_store.discard_replaced()
+    if near_dedup and args.near_index:
+        near_dedup.save_index(args.near_index)
+    if checkpoint:
+        checkpoint.remove()
 
+    stats = pipeline.stats
     print("=" * 40)
     print(f"PIPELINE COMPLETE")
-    print(f"Total Lines Processed: {total_count}")
-    print(f"Exact Duplicates Removed: {dropped_exact}")
-    print(f"Near Duplicates Removed:  {dropped_near}")
+    print(f"Total Lines Processed: {stats['clean'].items_in}")
+    print(f"Exact Duplicates Removed: {stats['exact_dedup'].dropped}")
+    if near_dedup:
+        print(f"Near Duplicates Removed:  {stats['near_dedup'].dropped}")
     print(f"Final Clean Lines:      {saved_count}")
-    print(f"Saved to:               {OUTPUT_PATH}")
+    print(f"Saved to:               {args.output}")
     print("=" * 40)
+    print(pipeline.report())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,142 @@
+import os
+import sys
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from balnlp.preprocessing.stopwords import BalochiStopwordRemover
+from balnlp.preprocessing.term_stats import TermStats
+from balnlp.utils.utils_file import compression_of, open_file
+
+# ==========================
+# SETTINGS
+# ==========================
+CORPUS_PATH = "/home/python-dev/BalNLP/corpus/balochi_corpus.txt"
+# Sketch size: 16 * WIDTH * DEPTH bytes per worker (64 MB with the defaults)
+WIDTH = 1 << 20
+DEPTH = 4
+TOP_K = 10_000
+# Bytes of an uncompressed file counted by one worker task
+SHARD_BYTES = 256 << 20
+NUM_WORKERS = 1
+MIN_DOC_RATIO = 0.05
+
+
+def shards(paths, shard_bytes):
+    """Split files into (path, start, end) byte ranges; compressed files stay whole."""
+    for path in paths:
+        size = os.path.getsize(path)
+        if compression_of(path) or size <= shard_bytes:
+            yield path, 0, None
+            continue
+        for start in range(0, size, shard_bytes):
+            yield path, start, min(start + shard_bytes, size)
+
+
+def read_shard(path, start, end):
+    """Lines that start inside [start, end), or every line when end is None."""
+    with open_file(path, 'rb') as f:
+        if end is None:
+            for raw_line in f:
+                yield raw_line.decode('utf-8')
+            return
+        if start:
+            # The line crossing start belongs to the previous shard.
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        for raw_line in f:
+            if position >= end:
+                break
+            position += len(raw_line)
+            yield raw_line.decode('utf-8')
+
+
+def count_shard(shard, width, depth, top_k):
+    stats = TermStats(width, depth, top_k)
+    stats.update(read_shard(*shard))
+    return stats
+
+
+def collect_stats(paths, args):
+    """Count every shard (in parallel with --workers) and merge the results."""
+    tasks = list(shards(paths, args.shard_bytes))
+    total = TermStats(args.width, args.depth, args.top_k)
+    if args.workers == 1:
+        for shard in tasks:
+            total.merge(count_shard(shard, args.width, args.depth, args.top_k))
+        return total
+
+    # Each result holds full-size sketches, so only a few are kept pending.
+    max_pending = 2 * (args.workers or os.cpu_count() or 1)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+        for shard in tasks:
+            pending.append(
+                pool.submit(count_shard, shard, args.width, args.depth, args.top_k)
+            )
+            if len(pending) >= max_pending:
+                total.merge(pending.popleft().result())
+        while pending:
+            total.merge(pending.popleft().result())
+    return total
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Count term statistics of a corpus and propose stopwords."
+    )
+    parser.add_argument("inputs", nargs="*", default=[CORPUS_PATH])
+    parser.add_argument(
+        "--workers", type=int, default=NUM_WORKERS,
+        help="Processes counting shards in parallel (0 = one per CPU)",
+    )
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--depth", type=int, default=DEPTH)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--shard-bytes", type=int, default=SHARD_BYTES)
+    parser.add_argument("--top", type=int, default=30, help="Terms shown in the report")
+    parser.add_argument(
+        "--min-doc-ratio", type=float, default=MIN_DOC_RATIO,
+        help="Propose terms found in at least this fraction of documents",
+    )
+    parser.add_argument("--max-stopwords", type=int, default=None)
+    parser.add_argument(
+        "--stopwords-out", default=None,
+        help="Write the current stopwords plus the proposals to this file",
+    )
+    parser.add_argument("--save", default=None, help="Save the statistics (.npz)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    paths = [p for p in args.inputs if os.path.isfile(p)]
+    if not paths:
+        print(f"ERROR: None of the inputs exist: {args.inputs}")
+        return
+
+    print(f">>> Counting terms in {len(paths)} file(s)...")
+    stats = collect_stats(paths, args)
+    print(stats.report(args.top))
+
+    if args.save:
+        stats.save(args.save)
+        print(f">>> Statistics saved to {args.save}")
+
+    remover = BalochiStopwordRemover()
+    proposals = stats.propose_stopwords(
+        args.min_doc_ratio, args.max_stopwords, exclude=remover.stopwords
+    )
+    print(f">>> {len(proposals)} new stopword candidates "
+          f"(df >= {args.min_doc_ratio:.1%}): {' '.join(proposals)}")
+    if args.stopwords_out:
+        remover.add_stopwords(set(proposals))
+        remover.save_stopwords(args.stopwords_out)
+        print(f">>> Stopwords written to {args.stopwords_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,11 @@ class BalochiGenerator:
         self.tokenizer_path = current_path / "models" / "tokenizer" / "balochi_bpe.model"
 
         # 2. Load Tokenizer
-        self.tokenizer = BalSentencePieceTokenizer(str(self.tokenizer_path))
+        # Prompts repeat a lot, so encodings/decodings are kept in LRU caches
+        self.tokenizer = BalSentencePieceTokenizer(
+            cache_entries=10_000, cache_bytes=32 * 1024 * 1024
+        )
+        self.tokenizer.load_model(str(self.tokenizer_path))
 
         # 3. Load Model Structure
         # We need a dummy key just to initialize the shape
@@ -1,51 +1,70 @@
 import sys
 import os
-import numpy as np
+from itertools import islice
 from pathlib import Path
 
 current_path = Path(__file__).resolve().parent.parent
 sys.path.append(str(current_path))
 
 from balnlp.bal_tokenizer.sentencepiece_tokenizer import BalSentencePieceTokenizer
+from balnlp.utils.line_index import LineIndex
+from balnlp.utils.token_dataset import TokenDatasetWriter
+from balnlp.utils.utils_file import compression_of, open_file
 
 
 def main():
     # --- CORRECT PATHS ---
     INPUT_CORPUS = current_path / "corpus" / "balochi_corpus.txt"
     TOKENIZER_MODEL = current_path / "models" / "tokenizer" / "balochi_bpe.model"
-    OUTPUT_DATA = current_path / "data" / "balochi_training_data.npy"
+    # Sharded token dataset: shard-*.bin tokens, shard-*.idx document
+    # offsets and index.json (read it with balnlp.utils.token_dataset.TokenDataset)
+    OUTPUT_DIR = current_path / "data" / "balochi_tokens"
+    BATCH_SIZE = 10000
+    NUM_THREADS = os.cpu_count() or 1
+    SHARD_TOKENS = 1 << 28
 
     if not TOKENIZER_MODEL.exists():
         print("❌ Tokenizer not found! Run Step 1 (train_tokenizer.py) first.")
         return
 
     print(">>> Loading Tokenizer...")
-    tokenizer = BalSentencePieceTokenizer(str(TOKENIZER_MODEL))
+    tokenizer = BalSentencePieceTokenizer()
+    tokenizer.load_model(str(TOKENIZER_MODEL))
 
     print(f">>> Reading Text: {INPUT_CORPUS}")
-    with open(INPUT_CORPUS, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    # Lines are decoded lazily from the memory-mapped corpus; a compressed
+    # corpus is streamed instead
+    if compression_of(str(INPUT_CORPUS)):
+        lines = open_file(str(INPUT_CORPUS))
+    else:
+        lines = LineIndex(str(INPUT_CORPUS))
 
-    all_tokens = []
+    writer = TokenDatasetWriter(
+        str(OUTPUT_DIR),
+        vocab_size=tokenizer.vocab_size,
+        shard_tokens=SHARD_TOKENS,
+        metadata={"tokenizer": str(TOKENIZER_MODEL), "eos_id": tokenizer.eos_id},
+    )
+    num_lines = 0
     print(f">>> Converting Text to Numbers...")
 
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line: continue
+    # Each batch is encoded by SentencePiece's threaded encoder straight into
+    # one flat array, with the EOS (End of Sentence) ID after every line, and
+    # appended to the memory-mapped shards; memory stays at about one batch
+    texts = (line.strip() for line in lines)
+    with lines, writer:
+        for batch in iter(lambda: list(islice(texts, BATCH_SIZE)), []):
+            batch = [text for text in batch if text]
+            tokens, offsets = tokenizer.encode_batch(
+                batch, num_threads=NUM_THREADS, add_eos=True
+            )
+            writer.write_batch(tokens, offsets)
+            num_lines += len(batch)
+            print(f"    Processed {num_lines} lines...", end="\r")
 
-        # Add EOS (End of Sentence) ID
-        ids = tokenizer.encode(line) + [tokenizer.eos_id]
-        all_tokens.extend(ids)
-
-        if i % 5000 == 0:
-            print(f"    Processed {i} lines...", end="\r")
-
-    # Save as highly compressed Numpy file
-    data_array = np.array(all_tokens, dtype=np.uint16)
-    np.save(OUTPUT_DATA, data_array)
-
-    print(f"\n✅ DATASET READY: {OUTPUT_DATA}")
-    print(f"   Total Tokens: {len(data_array)}")
+    print(f"\n✅ DATASET READY: {OUTPUT_DIR}")
+    print(f"   Total Tokens: {writer.num_tokens:,} in {len(writer.shards)} shard(s)")
+    print(f"   Documents: {writer.num_documents:,}, dtype: {writer.dtype.name}")
 
 
 if __name__ == "__main__":
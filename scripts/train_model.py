@@ -1,10 +1,11 @@
 import sys
 import os
+import json
+import argparse
 import jax
 import jax.numpy as jnp
 import optax
 import equinox as eqx
-import numpy as np
 from pathlib import Path
 
 # --- PATH SETUP ---
@@ -16,23 +17,80 @@ from balnlp.modeling.fractal_net import BalochiPhysicsTransformer
 
 # 2. Import your Config
 from balnlp.modeling.config import model_config, train_config
+from balnlp.modeling import parallel
+from balnlp.utils.batch_loader import BatchLoader, BlockSampler
+from balnlp.utils.token_dataset import TokenDataset
 
-def get_batch(data, batch_size, seq_len):
+
+def checkpoint_paths(model_path):
+    """Optimizer state and loader state files saved next to the model."""
+    return (
+        model_path.with_suffix(".opt.eqx"),
+        model_path.with_suffix(".state.json"),
+    )
+
+
+def save_checkpoint(model_path, model, opt_state, loader):
     """
-    Randomly selects a chunk of text for training.
+    Save the model, the optimizer state and the loader position.
+
+    Each file is replaced atomically and the loader state is written last,
+    so an interrupted save never pairs a new model with an old position.
     """
-    # Ensure we don't go out of bounds
-    max_idx = len(data) - seq_len - 1
-    ix = np.random.randint(0, max_idx, batch_size)
+    opt_path, state_path = checkpoint_paths(model_path)
+    for path, tree in ((model_path, model), (opt_path, opt_state)):
+        eqx.tree_serialise_leaves(str(path) + ".tmp", tree)
+        os.replace(str(path) + ".tmp", path)
+    with open(str(state_path) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"loader": loader.state_dict()}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(str(state_path) + ".tmp", state_path)
+
+
+def load_checkpoint(model_path, model, opt_state):
+    """Return (model, opt_state, loader_state), or None without a checkpoint."""
+    opt_path, state_path = checkpoint_paths(model_path)
+    if not (model_path.exists() and opt_path.exists() and state_path.exists()):
+        return None
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    model = eqx.tree_deserialise_leaves(str(model_path), model)
+    opt_state = eqx.tree_deserialise_leaves(str(opt_path), opt_state)
+    return model, opt_state, state["loader"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the Balochi physics model.")
+    parser.add_argument(
+        "--num-devices", type=int, default=None,
+        help="Devices to split each batch over (default: all local devices)",
+    )
+    parser.add_argument(
+        "--host-devices", type=int, default=None,
+        help="Split the host CPU into this many XLA devices "
+             "(sets --xla_force_host_platform_device_count)",
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=1000,
+        help="Steps between checkpoints of the model, optimizer and loader "
+             "(0 = only at the end)",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="Start from step 0 even if a checkpoint exists",
+    )
+    return parser.parse_args()
 
-    # Stack arrays
-    x = np.stack([data[i: i + seq_len] for i in ix])
-    y = np.stack([data[i + 1: i + seq_len + 1] for i in ix])
-    return jnp.array(x), jnp.array(y)
 
 def main():
+    args = parse_args()
+    if args.host_devices:
+        # Must happen before the first JAX computation initializes the backend
+        parallel.set_host_device_count(args.host_devices)
+
     # --- PATHS ---
-    DATA_PATH = current_path / "data" / "balochi_training_data.npy"
+    DATA_PATH = current_path / "data" / "balochi_tokens"
     MODEL_SAVE = current_path / "models" / "balochi_physics.eqx"
 
     if not DATA_PATH.exists():
@@ -40,8 +98,8 @@ def main():
         print("   Run 'scripts/tokenize_data.py' first.")
         return
 
-    # Load Data
-    raw_data = np.load(DATA_PATH, mmap_mode='r')
+    # Load Data (shards are memory-mapped, nothing is read up front)
+    raw_data = TokenDataset(str(DATA_PATH))
     print(f"🚀 Starting Physics Training on {len(raw_data):,} tokens...")
     print(f"⚙️  Config: Vocab={model_config.vocab_size}, Dims={model_config.embed_dim}, Depth={model_config.fractal_iterations}")
 
@@ -71,6 +129,31 @@ def main():
     optimizer = optax.adamw(learning_rate=scheduler, weight_decay=1e-2)
     opt_state = optimizer.init(eqx.filter(model, eqx.is_array))
 
+    # --- RESUME ---
+    # The loader state holds the sampler seed and step, so a resumed run
+    # continues with the exact batch after the last checkpoint.
+    loader_state = None
+    checkpoint = None if args.fresh else load_checkpoint(MODEL_SAVE, model, opt_state)
+    if checkpoint:
+        model, opt_state, loader_state = checkpoint
+        print(f"♻️  Resuming from step {loader_state['step']} ({MODEL_SAVE})")
+
+    # --- DEVICES ---
+    # Data parallel: every device holds a copy of the model and gets an equal
+    # slice of each batch; gradients are averaged across devices before the
+    # update, so the loss equals the single-device loss of the same batch.
+    mesh = parallel.make_mesh(args.num_devices)
+    num_devices = mesh.size
+    if train_config.batch_size % num_devices:
+        raise ValueError(
+            f"batch_size {train_config.batch_size} is not divisible "
+            f"by {num_devices} devices"
+        )
+    model = parallel.replicate(model, mesh)
+    opt_state = parallel.replicate(opt_state, mesh)
+    print(f"🖥️  Devices: {num_devices} x {jax.local_devices()[0].platform}, "
+          f"{train_config.batch_size // num_devices} sequences each")
+
     # --- LOSS FUNCTION ---
     @eqx.filter_value_and_grad
     def compute_loss(model, x, y):
@@ -85,33 +168,49 @@ def main():
         )
         return jnp.mean(loss)
 
-    # --- OPTIMIZATION STEP (Compiled on GPU/CPU) ---
-    @eqx.filter_jit
-    def make_step(model, opt_state, x, y):
-        loss, grads = compute_loss(model, x, y)
-        updates, opt_state = optimizer.update(grads, opt_state, model)
-        model = eqx.apply_updates(model, updates)
-        return loss, model, opt_state
+    # --- OPTIMIZATION STEP (Compiled on GPU/CPU, one copy per device) ---
+    make_step = parallel.data_parallel_step(compute_loss, optimizer, mesh)
 
     # --- TRAINING LOOP ---
     print(">>> Entering Quantum-Fractal Simulation Loop...")
 
-    for step in range(total_steps):
-        # Get Batch
-        xb, yb = get_batch(raw_data, train_config.batch_size, train_config.seq_len)
+    # Every epoch visits each block of seq_len + 1 tokens once, in a seeded
+    # order. Batches are gathered on a background thread and copied to the
+    # devices one step ahead, already split over the mesh, so the jitted
+    # step never waits on the host
+    sampler = BlockSampler(
+        raw_data, train_config.seq_len, train_config.batch_size, seed=train_config.seed
+    )
+    print(f"   {sampler.num_blocks:,} blocks, "
+          f"{sampler.steps_per_epoch:,} steps per epoch")
+    loader = BatchLoader(
+        raw_data,
+        train_config.batch_size,
+        train_config.seq_len,
+        transfer=parallel.shard_batch(mesh),
+        sampler=sampler,
+    )
+    if loader_state:
+        loader.load_state_dict(loader_state)
+    start_step = loader.step
+    os.makedirs(MODEL_SAVE.parent, exist_ok=True)
 
+    for step, (xb, yb) in zip(range(start_step, total_steps), loader):
         # Train
         loss, model, opt_state = make_step(model, opt_state, xb, yb)
 
+        if args.checkpoint_every and (step + 1) % args.checkpoint_every == 0:
+            save_checkpoint(MODEL_SAVE, model, opt_state, loader)
+
         if step % train_config.log_interval == 0:
             # Get current Learning Rate for logging
             current_lr = scheduler(step)
-            print(f"Step {step} | Energy Loss: {loss.item():.4f} | LR: {current_lr:.6f}")
+            epoch = sampler.epoch_of(step)
+            print(f"Step {step} | Epoch {epoch} | "
+                  f"Energy Loss: {loss.item():.4f} | LR: {current_lr:.6f}")
 
     # --- SAVE ---
-    # Ensure folder exists
-    os.makedirs(MODEL_SAVE.parent, exist_ok=True)
-    eqx.tree_serialise_leaves(str(MODEL_SAVE), model)
+    save_checkpoint(MODEL_SAVE, model, opt_state, loader)
     print(f"✅ Physics Model Saved to: {MODEL_SAVE}")
 
 if __name__ == "__main__":
@@ -11,13 +11,18 @@ from balnlp.bal_tokenizer.sentencepiece_tokenizer import BalSentencePieceTokeniz
 
 def main():
     # --- CORRECT PATHS FOR YOUR STRUCTURE ---
-    # Input: The clean text you just built
+    # Input: The clean text you just built (may be .gz/.bz2/.xz compressed)
     INPUT_CORPUS = current_path / "corpus" / "balochi_corpus.txt"
 
     # Output: Where to save the tokenizer model
     MODEL_DIR = current_path / "models" / "tokenizer"
     MODEL_PREFIX = str(MODEL_DIR / "balochi_bpe")
 
+    # Sentences sampled (uniformly, shuffled) from the corpus for training;
+    # keeps tokenizer training time and memory flat as the corpus grows
+    INPUT_SENTENCE_SIZE = 5_000_000
+    MAX_SENTENCE_LENGTH = 8192
+
     # Check if corpus exists
     if not INPUT_CORPUS.exists():
         print(f"❌ Error: Corpus not found at {INPUT_CORPUS}")
@@ -28,14 +33,15 @@ def main():
 
     print(f"🚀 Training Tokenizer on: {INPUT_CORPUS}")
 
-    tokenizer = BalSentencePieceTokenizer()
+    tokenizer = BalSentencePieceTokenizer(model_prefix=MODEL_PREFIX)
 
-    # Train (Vocabulary = 32000)
+    # Train (Vocabulary = 32000); SentencePiece reads the corpus itself
     tokenizer.train(
-        input_file=str(INPUT_CORPUS),
-        model_prefix=MODEL_PREFIX,
+        input_files=str(INPUT_CORPUS),
         vocab_size=32000,
-        model_type="bpe"
+        input_sentence_size=INPUT_SENTENCE_SIZE,
+        shuffle_input_sentence=True,
+        max_sentence_length=MAX_SENTENCE_LENGTH,
     )
 
     print(f"✅ Tokenizer Saved to: {MODEL_PREFIX}.model")